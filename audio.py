@@ -0,0 +1,119 @@
+# Sound effects, with as little delay as possible between something happening and its sound being heard, and as little
+# work as possible for the game's own thread.
+#
+# The WAV files are converted to the mixer's own format (frequency, sample size, number of channels) the first time
+# that they are loaded, and saved in a cache folder, so after that loading a sound is just reading a file. Sounds are
+# started by a separate thread, so the game never waits for the mixer. The mixer's frequency and buffer size are set by
+# a preset: smaller buffers mean sounds are heard sooner, but the mixer has to run more often, using more CPU.
+
+import os
+import pygame                           # 2d games engine.
+import queue
+import threading
+import time
+
+# Frequency in Hz, and buffer size in samples, of each preset.
+PRESETS = {'low latency': [22050, 256],         # About 12 ms per buffer.
+           'balanced': [22050, 512],            # About 23 ms.
+           'low cpu': [22050, 1024]}            # About 46 ms.
+
+
+# Start the mixer with the frequency and buffer size of parm preset.
+def start_mixer(preset):
+    [frequency, buffer] = PRESETS[preset]
+    pygame.mixer.init(frequency, -16, 2, buffer)
+
+
+# Load the sound in parm WAV file. If it has already been converted to the mixer's format, it is read from parm cache
+# folder, otherwise it is converted and saved there.
+def load_sound(filename, cache_folder):
+    [frequency, size, channels] = pygame.mixer.get_init()
+    cache_name = os.path.join(cache_folder, os.path.basename(filename) + '.' + str(frequency) + '_' + str(size)
+                              + '_' + str(channels) + '.raw')
+
+    if os.path.exists(cache_name) and os.path.getmtime(cache_name) >= os.path.getmtime(filename):
+        with open(cache_name, 'rb') as f:
+            return pygame.mixer.Sound(buffer=f.read())
+
+    sound = pygame.mixer.Sound(filename)
+    try:
+        os.makedirs(cache_folder, exist_ok=True)
+        with open(cache_name, 'wb') as f:
+            f.write(sound.get_raw())
+    except OSError:
+        pass                                    # Can't be saved, so it will be converted again next time.
+    return sound
+
+
+# Thread that starts sounds playing, so that the game's thread doesn't have to wait while the mixer is busy.
+class Player:
+
+    def __init__(self):
+        self.queue = queue.Queue()              # [channel, sound] pairs waiting to be played.
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:                    # Asked to stop.
+                return
+            [channel, sound] = item
+            channel.play(sound)
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+
+
+# Stands in for a pygame.mixer.Channel. Sounds played on it are passed to the Player's thread to start.
+class QueuedChannel:
+
+    def __init__(self, channel, player):
+        self.channel = channel
+        self.player = player
+
+    def play(self, sound):
+        self.player.queue.put_nowait([self.channel, sound])
+
+
+# Seconds of sound in each of the mixer's buffers, with parm preset.
+def buffer_seconds(preset):
+    [frequency, buffer] = PRESETS[preset]
+    return buffer / frequency
+
+
+# Wake-up latency of a Python thread, as a rough sign of whether the mixer might have run out of sound to play (an
+# underrun, heard as a click or gap). Pygame doesn't say when that happens, and SDL's mixer thread can't be seen from
+# Python, so instead a thread sleeps for half a buffer at a time, and counts the times that it woke up more than a
+# whole buffer late. This is only a proxy: it over counts when the Python interpreter holds this thread up but not
+# the mixer, and misses underruns that happen for reasons of the mixer's own.
+class StallMonitor:
+
+    def __init__(self, buffer_seconds):
+        self.buffer_seconds = buffer_seconds
+        self.late_wakeups = 0                   # Number of times woken up more than a buffer late.
+        self.longest = 0                        # Longest time late, in seconds.
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        period = self.buffer_seconds / 2
+        while self.running:
+            start = time.perf_counter()
+            time.sleep(period)
+            late = time.perf_counter() - start - period
+            if late > self.buffer_seconds:
+                self.late_wakeups += 1
+            self.longest = max(self.longest, late)
+
+    def close(self):
+        self.running = False
+        self.thread.join()
+
+    def report(self):
+        return ('Audio thread wake-up latency: ' + str(self.late_wakeups) + ' wake-ups later than the '
+                + str(round(1000 * self.buffer_seconds, 1)) + ' ms mixer buffer, longest '
+                + str(round(1000 * self.longest, 1)) + ' ms late. Only a hint of clicks, as the mixer\'s own thread'
+                + ' can\'t be seen.')
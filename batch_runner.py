@@ -0,0 +1,208 @@
+# Runs lots of headless games at once, spread over a pool of processes, for tuning the game balance and training an
+# autopilot. The interface is like a vectorised gym environment: reset() starts every game, and step() does one tick
+# of every game with the keys chosen for each one. Both return a NumPy array with a row of numbers describing each game.
+#
+# Actions are key bits, the same as in replay recordings: 1 = Z (rotate anticlockwise), 2 = X (rotate clockwise),
+# 4 = A (fire). So action 5 is turn anticlockwise while firing.
+#
+# To see how many ticks per second can be done,
+#   python batch_runner.py --envs 8 --processes 4
+
+import argparse
+import multiprocessing
+import numpy_arrays                     # NumPy is needed for the observation arrays.
+import replay
+import space_rocks
+import sys
+import time
+
+np = numpy_arrays.np
+
+MAX_BULLETS = 5                         # Most bullets that a ship can have in flight at once.
+
+# Each row of observations is these numbers, followed by x, y, bounding radius and exploding (1 or 0) of up to
+# max_rocks rocks, then x, y of up to MAX_BULLETS bullets. Missing rocks and bullets are all zeros.
+SHIP_FIELDS = ['rotation', 'score', 'seconds_left', 'exploding']
+
+
+# Size of a row of observations.
+def observation_size(max_rocks):
+    return len(SHIP_FIELDS) + 4 * max_rocks + 2 * MAX_BULLETS
+
+
+# Row of numbers describing parm game.
+def observe(this_game, max_rocks):
+    ship = this_game.players[0].ship
+    row = np.zeros(observation_size(max_rocks), dtype=np.float32)
+    row[:len(SHIP_FIELDS)] = [ship.rotation % 360,
+                              this_game.players[0].score,
+                              this_game.game_end_time - this_game.config.now(),
+                              ship.exploding]
+
+    start = len(SHIP_FIELDS)
+    for n, r in enumerate(this_game.rocks):
+        if n == max_rocks:
+            break
+        row[start + 4 * n: start + 4 * n + 4] = [r.coords[0], r.coords[1], r.bounding_radius, r.exploding]
+
+    start += 4 * max_rocks
+    for n, b in enumerate(ship.bullets):
+        row[start + 2 * n: start + 2 * n + 2] = b.coords
+    return row
+
+
+# One headless game, that starts again from a new seed each time it is reset.
+class Environment:
+
+    def __init__(self, seed, max_rocks):
+        self.config = space_rocks.Config(False, 25, headless=True, seed=seed)
+        self.config.adaptive_quality = False            # Every game is played at the same quality level.
+        self.max_rocks = max_rocks
+        self.game = None
+        self.episodes = 0                               # Number of games finished.
+
+    def reset(self):
+        if self.game is not None:
+            self.game.release_to_pools()
+        self.game = self.config.new_game()
+        self.config.demo_mode = False
+        return observe(self.game, self.max_rocks)
+
+    # Do parm number of ticks with the keys in parm key bits held down. Returns the observation, the change in score,
+    # and the final score if the game has finished (in which case a new game is started), otherwise None.
+    def step(self, bits, repeat):
+        keys = replay.RecordedKeys(bits)
+        score = self.game.players[0].score
+        for t in range(repeat):
+            self.game.key_handling(keys)
+            self.game.animate_1_tick()
+
+        reward = self.game.players[0].score - score
+        if self.config.now() < self.game.game_end_time:
+            return observe(self.game, self.max_rocks), reward, None
+
+        final_score = self.game.players[0].score
+        self.episodes += 1
+        return self.reset(), reward, final_score
+
+
+# Runs in each process of the pool, looking after some of the environments. Commands come in through parm pipe.
+def worker(pipe, seeds, max_rocks):
+    environments = [Environment(seed, max_rocks) for seed in seeds]
+
+    while True:
+        [command, data] = pipe.recv()
+
+        if command == 'reset':
+            pipe.send(np.stack([e.reset() for e in environments]))
+
+        elif command == 'step':
+            [actions, repeat] = data
+            results = [e.step(int(bits), repeat) for e, bits in zip(environments, actions)]
+            pipe.send(results)
+
+        else:
+            pipe.close()
+            return
+
+
+class BatchRunner:
+
+    def __init__(self, num_envs, processes=None, seed=0, max_rocks=32, repeat=1):
+        assert numpy_arrays.available()
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        processes = min(processes, num_envs)
+
+        self.num_envs = num_envs
+        self.max_rocks = max_rocks
+        self.repeat = repeat                            # Ticks done per step, with the same keys held down.
+
+        # Environments are shared out between the processes as evenly as possible. Environment n has seed + n.
+        self.slices = [range(n, num_envs, processes) for n in range(processes)]
+        self.pipes = []
+        self.processes = []
+        for envs in self.slices:
+            pipe, worker_pipe = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=worker,
+                                              args=(worker_pipe, [seed + n for n in envs], max_rocks),
+                                              daemon=True)
+            process.start()
+            worker_pipe.close()
+            self.pipes.append(pipe)
+            self.processes.append(process)
+
+        self.ticks = 0                                  # Ticks done, over all of the environments.
+        self.final_scores = []                          # Final score of each game finished.
+        self.seconds = 0                                # Time spent in step().
+
+    # Start a new game in every environment. Returns the array of observations, one row per environment.
+    def reset(self):
+        for pipe in self.pipes:
+            pipe.send(['reset', None])
+        observations = np.zeros((self.num_envs, observation_size(self.max_rocks)), dtype=np.float32)
+        for envs, pipe in zip(self.slices, self.pipes):
+            observations[list(envs)] = pipe.recv()
+        return observations
+
+    # Do a step of every environment, with parm array of key bits, one per environment. Returns arrays of the
+    # observations, rewards (change in score) and dones (game finished, and a new one started).
+    def step(self, actions):
+        start = time.perf_counter()
+        for envs, pipe in zip(self.slices, self.pipes):
+            pipe.send(['step', [[actions[n] for n in envs], self.repeat]])
+
+        observations = np.zeros((self.num_envs, observation_size(self.max_rocks)), dtype=np.float32)
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        dones = np.zeros(self.num_envs, dtype=bool)
+        for envs, pipe in zip(self.slices, self.pipes):
+            for n, [observation, reward, final_score] in zip(envs, pipe.recv()):
+                observations[n] = observation
+                rewards[n] = reward
+                if final_score is not None:
+                    dones[n] = True
+                    self.final_scores.append(final_score)
+
+        self.ticks += self.num_envs * self.repeat
+        self.seconds += time.perf_counter() - start
+        return observations, rewards, dones
+
+    # Totals over all of the environments since the runner was made.
+    def statistics(self):
+        stats = {'ticks': self.ticks,
+                 'ticks_per_second': round(self.ticks / self.seconds) if self.seconds else 0,
+                 'games_finished': len(self.final_scores)}
+        if self.final_scores:
+            stats['mean_final_score'] = round(sum(self.final_scores) / len(self.final_scores), 1)
+            stats['best_final_score'] = max(self.final_scores)
+        return stats
+
+    def close(self):
+        for pipe in self.pipes:
+            pipe.send(['close', None])
+        for process in self.processes:
+            process.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run lots of headless games of Space Rocks, with random keys.')
+    parser.add_argument('--envs', type=int, default=8, help='Number of games to run at once.')
+    parser.add_argument('--processes', type=int, default=None, help='Size of process pool. Default is one per CPU.')
+    parser.add_argument('--steps', type=int, default=2000, help='Number of steps of every game.')
+    parser.add_argument('--repeat', type=int, default=1, help='Ticks per step.')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    runner = BatchRunner(args.envs, args.processes, args.seed, repeat=args.repeat)
+    actions_random = np.random.RandomState(args.seed)
+    runner.reset()
+    for s in range(args.steps):
+        runner.step(actions_random.randint(0, 8, args.envs))
+    runner.close()
+
+    print(runner.statistics())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,215 @@
+# Benchmark the parts of the game that are done every frame, with increasing numbers of rocks.
+#
+# Results are written as JSON, and compared against a stored baseline. If anything has got more than the tolerance
+# slower than the baseline, the benchmark fails with a non-zero exit code. So does a missing baseline, or one made on a
+# different kind of machine or with different versions of Python, Pygame or NumPy, as nothing has been compared.
+#
+# python benchmark.py                       Run, and compare with benchmark_baseline.json
+# python benchmark.py --save-baseline       Run, and store the results as the new baseline.
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+# Use SDL's dummy drivers, so that no screen or sound hardware is needed.
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+os.environ['SDL_AUDIODRIVER'] = 'dummy'
+
+import cartesian_coordinates as cc
+import numpy_arrays
+import pygame
+import replay
+import space_rocks
+
+
+# Make a headless game with parm number of rocks spread across the screen, and every ship's bullets in flight.
+def make_game(config, rock_count):
+    this_game = space_rocks.Game(config)
+    config.demo_mode = False                        # So that collisions are checked.
+    this_game.num_rocks = rock_count
+
+    while len(this_game.rocks) < rock_count:
+        new_rock = config.rock_pool.acquire(config, config.random.choice(['Small', 'Medium', 'Large']))
+        new_rock.place_on_side_of_screen(config)
+        new_rock.coords = [config.random.uniform(0, config.screen_size[0]),
+                           config.random.uniform(0, config.screen_size[1])]
+        this_game.rocks.spawn(new_rock)
+        this_game.rocks.flush()
+
+    fire_all_bullets(this_game)
+    return this_game
+
+
+# Keep each ship firing, so that the max number of bullets are on screen.
+def fire_all_bullets(this_game):
+    for p in this_game.players:
+        for b in range(5):
+            p.ship.fire_bullet(this_game.config)
+
+
+# Call parm function in parm number of batches. Return microseconds per call in the fastest batch, as the slower
+# batches are mostly measuring whatever else the computer was doing at the time. Parm calls is the fewest calls in a
+# batch, and is doubled until a batch takes at least parm min_seconds, so that quick functions on a fast computer are
+# timed for long enough to be measured.
+def time_calls(function, calls, min_seconds, batches=5):
+    while True:
+        start = time.perf_counter()
+        for c in range(calls):
+            function()
+        if time.perf_counter() - start >= min_seconds:
+            break
+        calls *= 2
+
+    per_call = []
+    for b in range(batches):
+        start = time.perf_counter()
+        for c in range(calls):
+            function()
+        per_call.append(1000000 * (time.perf_counter() - start) / calls)
+    return min(per_call)
+
+
+# Benchmark each hot path with parm number of rocks. Returns a dictionary of microseconds per call.
+def run_scenario(rock_count, ticks, min_seconds):
+    config = space_rocks.Config(False, 25, headless=True, seed=rock_count)
+    this_game = make_game(config, rock_count)
+    results = {}
+
+    def one_tick():
+        fire_all_bullets(this_game)
+        this_game.animate_1_tick()
+
+    results['Game.animate_1_tick'] = time_calls(one_tick, ticks, min_seconds)
+    results['Game.draw_all_elements'] = time_calls(this_game.draw_all_elements, ticks, min_seconds)
+
+    rocks = this_game.rocks
+    point = config.screen_centre
+
+    def check_all_rocks():
+        for r in rocks:
+            r.check_collision(point)
+
+    def draw_all_rocks():
+        for r in rocks:
+            r.draw(config)
+        config.render_queue.submit(config.screen)
+
+    results['Rock.check_collision'] = time_calls(check_all_rocks, ticks, min_seconds) / len(rocks)
+    results['Rock.draw'] = time_calls(draw_all_rocks, ticks, min_seconds) / len(rocks)
+    results['cc.rotate_around_origin'] = time_calls(lambda: cc.rotate_around_origin([3, 4], 37), ticks, min_seconds)
+
+    return {name + ' ' + str(rock_count) + ' rocks': round(us, 3) for name, us in results.items()}
+
+
+# Time the playback of parm recorded game, with or without drawing each frame. Returns a dictionary of microseconds
+# per tick, using the fastest of parm number of playbacks.
+def run_replay(filename, render, batches=3):
+    recording = replay.Recording(filename)
+    per_tick = []
+    for b in range(batches):
+        this_game = replay.make_game(recording, render)
+        start = time.perf_counter()
+        ticks = replay.play_ticks(recording, this_game)
+        per_tick.append(1000000 * (time.perf_counter() - start) / ticks)
+
+    name = 'Replay ' + os.path.basename(filename) + (' rendered' if render else ' headless')
+    return {name: round(min(per_tick), 3)}
+
+
+# The things that timings depend on, other than the speed of the hardware. Timings are only compared with a baseline
+# made with the same ones. These are kept coarse, such as the Python version without its patch number, so that a
+# kernel or Python update doesn't stop the comparison. 'platform' is saved too, but only for information.
+ENVIRONMENT = ['machine', 'python', 'pygame', 'numpy']
+
+
+# Describe each way that parm report's environment differs from parm baseline's.
+def environment_differences(report, baseline):
+    differences = []
+    for name in ENVIRONMENT:
+        if report[name] != baseline.get(name):
+            differences.append(name + ' is ' + str(report[name]) + ', baseline ' + str(baseline.get(name)))
+    return differences
+
+
+# Compare results with baseline. Returns a list of descriptions of the ones that have got too much slower.
+def regressions(results, baseline, tolerance):
+    slower = []
+    for name, us in results.items():
+        if name in baseline and us > baseline[name] * (1 + tolerance):
+            slower.append(name + ': ' + str(us) + ' us, baseline ' + str(baseline[name]) + ' us')
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the per frame hot paths of Space Rocks.')
+    parser.add_argument('--counts', type=int, nargs='+', default=[15, 150, 1500], help='Numbers of rocks to try.')
+    parser.add_argument('--ticks', type=int, default=20, help='Fewest calls per batch of timings.')
+    parser.add_argument('--min-time', type=float, default=0.1, help='Fewest seconds per batch of timings.')
+    parser.add_argument('--output', default='benchmark_results.json', help='File to write JSON results to.')
+    parser.add_argument('--baseline', default='benchmark_baseline.json', help='Baseline JSON file.')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed slow down, 0.25 = 25%%.')
+    parser.add_argument('--save-baseline', action='store_true', help='Store the results as the new baseline.')
+    parser.add_argument('--any-environment', action='store_true',
+                        help='Compare with the baseline even if it was made with a different Python, Pygame or OS.')
+    parser.add_argument('--replay', nargs='+', default=[], help='Recorded games to time the playback of.')
+    args = parser.parse_args()
+
+    results = {}
+    for rock_count in args.counts:
+        results.update(run_scenario(rock_count, args.ticks, args.min_time))
+    for filename in args.replay:
+        results.update(run_replay(filename, False))
+        results.update(run_replay(filename, True))
+
+    report = {'platform': platform.platform(),
+              'machine': platform.machine(),
+              'python': '.'.join(platform.python_version_tuple()[:2]),
+              'pygame': pygame.version.ver,
+              'numpy': numpy_arrays.available(),
+              'microseconds_per_call': results}
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    for name, us in results.items():
+        print(name.ljust(45), str(us).rjust(12), 'us')
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print('Baseline saved to', args.baseline)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print('FAILED. No baseline found at', args.baseline, '- run with --save-baseline to make one.')
+        return 1
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    differences = environment_differences(report, baseline)
+    if differences:
+        print('Baseline was made in a different environment,')
+        for description in differences:
+            print('   ', description)
+        if not args.any_environment:
+            print('FAILED. Not compared. Run with --save-baseline to make a new baseline, or --any-environment to'
+                  ' compare anyway.')
+            return 1
+
+    slower = regressions(results, baseline['microseconds_per_call'], args.tolerance)
+    if slower:
+        print('FAILED. Slower than baseline by more than ' + str(round(100 * args.tolerance)) + '%,')
+        for description in slower:
+            print('   ', description)
+        return 1
+
+    print('OK. Nothing slower than baseline by more than ' + str(round(100 * args.tolerance)) + '%.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,6 +3,12 @@
 import math
 
 
+# Cosine and sine of every whole number of degrees from 0 to 359. Every rotation in the game is by a whole number of
+# degrees, so this table lets rotations be done without calling any trig functions.
+# A dictionary rather than a list, so that it can be looked up with either an int or a float, such as 30.0
+TRIG_TABLE = {degrees: (math.cos(math.radians(degrees)), math.sin(math.radians(degrees))) for degrees in range(360)}
+
+
 # Convert vertex with float coordinates into integer coordinates.
 # Needed because some Pygame functions need integer coords.
 def integer_coord(vertex):
@@ -24,17 +30,72 @@ def scale(vertex, scale_factor):
     [vertex_x, vertex_y] = vertex
     return [vertex_x * scale_factor, vertex_y * scale_factor]
 
+
+# The next few functions are variations of the ones above, that avoid making new lists.
+# Tuples are smaller than lists, and the in place versions change the parm vertex list itself.
+
+def translation_tuple(vertex, delta):
+    return (vertex[0] + delta[0], vertex[1] + delta[1])
+
+
+def translate_in_place(vertex, delta):
+    vertex[0] += delta[0]
+    vertex[1] += delta[1]
+
+
+def scale_tuple(vertex, scale_factor):
+    return (vertex[0] * scale_factor, vertex[1] * scale_factor)
+
+
+def scale_in_place(vertex, scale_factor):
+    vertex[0] *= scale_factor
+    vertex[1] *= scale_factor
+
+
 # For explanation of the maths, see,
 # https://en.wikipedia.org/wiki/Rotation_of_axes#Derivation
 def rotate_around_origin(vertex, rotation_degrees):
     [vertex_x, vertex_y] = vertex
     rotation_radians = math.radians(rotation_degrees)
+    cos = math.cos(rotation_radians)
+    sin = math.sin(rotation_radians)
 
-    return[vertex_x * math.cos(rotation_radians) + vertex_y * math.sin(rotation_radians),
-           - vertex_x * math.sin(rotation_radians) + vertex_y * math.cos(rotation_radians)
+    return[vertex_x * cos + vertex_y * sin,
+           - vertex_x * sin + vertex_y * cos
            ]
 
 
+# Same as rotate_around_origin, but the sine and cosine are looked up in the tables.
+# Falls back to calculating them if the rotation is not a whole number of degrees.
+def rotate_by_table(vertex, rotation_degrees):
+    cos_sin = TRIG_TABLE.get(rotation_degrees % 360)
+    if cos_sin is None:
+        return rotate_around_origin(vertex, rotation_degrees)
+
+    [vertex_x, vertex_y] = vertex
+    [cos, sin] = cos_sin
+
+    return [vertex_x * cos + vertex_y * sin,
+            - vertex_x * sin + vertex_y * cos
+            ]
+
+
+# A shape (list of vertices centered around origin), plus a cache of the shape rotated to each angle that it has been
+# asked for so far. Angles are whole degrees, so there can be at most 360 rotated versions of the shape in the cache.
+class RotationCache:
+
+    def __init__(self, vertices):
+        self.vertices = vertices                            # The shape, unrotated.
+        self.rotated_shapes = {}                            # Key is rotation % 360, value is list of vertices.
+
+    # The shape's vertices rotated by parm number of degrees. The returned list is shared, so must not be modified.
+    def rotated(self, rotation_degrees):
+        key = rotation_degrees % 360
+        if key not in self.rotated_shapes:
+            self.rotated_shapes[key] = [rotate_by_table(vertex, key) for vertex in self.vertices]
+        return self.rotated_shapes[key]
+
+
 # Rotate a vertex around some arbitrary pivot point.
 #
 # Method has 3 steps,
@@ -51,6 +112,22 @@ def rotate_around_a_point(vertex, pivot, rotation_degrees):
     return re_moved_vertex
 
 
+# Same as rotate_around_a_point, but returns a tuple. Rotations by a whole number of degrees use the lookup table,
+# others are calculated.
+def rotate_around_a_point_tuple(vertex, pivot, rotation_degrees):
+    moved_vertex = [vertex[0] - pivot[0], vertex[1] - pivot[1]]
+    if rotation_degrees == int(rotation_degrees):
+        [rotated_x, rotated_y] = rotate_by_table(moved_vertex, rotation_degrees)
+    else:
+        [rotated_x, rotated_y] = rotate_around_origin(moved_vertex, rotation_degrees)
+    return (rotated_x + pivot[0], rotated_y + pivot[1])
+
+
+# Same as rotate_around_a_point, but changes the parm vertex list itself.
+def rotate_around_a_point_in_place(vertex, pivot, rotation_degrees):
+    [vertex[0], vertex[1]] = rotate_around_a_point_tuple(vertex, pivot, rotation_degrees)
+
+
 # The next two functions are Based upon,
 # https://www.geeksforgeeks.org/check-whether-a-given-point-lies-inside-a-triangle-or-not/
 
@@ -80,3 +157,45 @@ def is_inside_triangle(v, v1, v2, v3):
         return True
     else:
         return False
+
+
+# Which side of the line through v1 and v2 is vertex v on? Positive one side, negative the other, zero if on the line.
+def side_of_line(v, v1, v2):
+    return (v[0] - v2[0]) * (v1[1] - v2[1]) - (v1[0] - v2[0]) * (v[1] - v2[1])
+
+
+# Same question as is_inside_triangle, answered by checking which side of each edge vertex v is on. Quicker than
+# calculating 4 areas, and needs no tolerance. Vertices on an edge count as inside.
+def is_inside_triangle_by_sign(v, v1, v2, v3):
+    d1 = side_of_line(v, v1, v2)
+    d2 = side_of_line(v, v2, v3)
+    d3 = side_of_line(v, v3, v1)
+
+    has_negative = d1 < 0 or d2 < 0 or d3 < 0
+    has_positive = d1 > 0 or d2 > 0 or d3 > 0
+    return not (has_negative and has_positive)
+
+
+# Is vertex v inside the polygon made from a fan of triangles, each with one corner at centre and the other two
+# corners at neighbouring vertices of outline? This is the shape of a rock. Stops at the first triangle containing v.
+def is_inside_fan(v, centre, outline):
+    prev_vertex = outline[-1]
+    for vertex in outline:
+        if is_inside_triangle_by_sign(v, prev_vertex, vertex, centre):
+            return True
+        prev_vertex = vertex
+    return False
+
+
+# Which of the parm vertices are inside the fan polygon? Returns a list of booleans, one per vertex. Vertices further
+# than radius from the centre are ruled out without looking at the triangles.
+def are_inside_fan(vertices, centre, outline, radius):
+    [centre_x, centre_y] = centre
+    radius_squared = radius * radius
+
+    results = []
+    for v in vertices:
+        dx = v[0] - centre_x
+        dy = v[1] - centre_y
+        results.append(dx * dx + dy * dy <= radius_squared and is_inside_fan(v, centre, outline))
+    return results
@@ -0,0 +1,113 @@
+# Store of game entities, such as rocks and bullets, that can be added and removed while the game is looping over them.
+#
+# Entities are kept in one dense list, so looping over them is as quick as looping over a plain list. Removing an entity
+# moves the last one into its place (swap-remove), which is O(1), rather than the O(n) of list.remove(). Entities added
+# or removed during a tick are queued, and only go in or out of the list when flush() is called. So while a tick is
+# looping over the entities, none are skipped, and none are seen twice.
+#
+# Each entity is identified by a handle, which is a (slot, generation) pair. When an entity is removed its slot can be
+# reused, but the slot's generation goes up by one, so old handles to the removed entity no longer find anything.
+
+
+class EntityStore:
+
+    def __init__(self):
+        self.items = []                         # The entities, packed together. Removals change the order.
+        self.slots = []                         # Slot number of each entity in items.
+        self.index = []                         # For each slot, position of its entity in items. None if not in items.
+        self.generations = []                   # For each slot, number of times that it has been freed.
+        self.free_slots = []                    # Slots that can be given to new entities.
+
+        self.spawn_queue = []                   # [handle, entity] pairs waiting to be added at the next flush.
+        self.despawn_queue = []                 # Handles of entities waiting to be removed at the next flush.
+        self.despawn_set = set()                # Same handles as despawn_queue, for quick checks of what is in it.
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    # Queue parm entity to be added at the next flush. Returns its handle.
+    def spawn(self, item):
+        if self.free_slots:
+            slot = self.free_slots.pop()
+        else:
+            slot = len(self.index)
+            self.index.append(None)
+            self.generations.append(0)
+
+        handle = (slot, self.generations[slot])
+        self.spawn_queue.append([handle, item])
+        return handle
+
+    # Queue the entity with parm handle to be removed at the next flush.
+    def despawn(self, handle):
+        if handle not in self.despawn_set:
+            self.despawn_set.add(handle)
+            self.despawn_queue.append(handle)
+
+    # Handle of the entity at parm position in the list of entities.
+    def handle_at(self, position):
+        slot = self.slots[position]
+        return slot, self.generations[slot]
+
+    # The entity with parm handle, or None if it has been removed (or not yet been added).
+    def get(self, handle):
+        [slot, generation] = handle
+        if self.generations[slot] != generation or self.index[slot] is None:
+            return None
+        return self.items[self.index[slot]]
+
+    # Number of entities that there will be once the queued adds and removes have been done.
+    def len_after_flush(self):
+        return len(self.items) + len(self.spawn_queue) - len(self.despawn_queue)
+
+    # Do the queued adds, then the queued removes. Returns a list of the entities that were removed.
+    def flush(self):
+        for [[slot, generation], item] in self.spawn_queue:
+            self.index[slot] = len(self.items)
+            self.items.append(item)
+            self.slots.append(slot)
+        self.spawn_queue = []
+
+        removed = []
+        for [slot, generation] in self.despawn_queue:
+            if self.generations[slot] != generation or self.index[slot] is None:
+                continue                        # Already removed.
+
+            # Move the last entity into the removed one's position, then shorten the list by one.
+            position = self.index[slot]
+            removed.append(self.items[position])
+            self.items[position] = self.items[-1]
+            self.slots[position] = self.slots[-1]
+            self.index[self.slots[position]] = position
+            self.items.pop()
+            self.slots.pop()
+
+            self.index[slot] = None
+            self.generations[slot] += 1
+            self.free_slots.append(slot)
+        self.despawn_queue = []
+        self.despawn_set = set()
+
+        return removed
+
+    # Remove every entity straight away, including any that are queued to be added. Returns a list of them.
+    def clear(self):
+        removed = self.items + [item for [handle, item] in self.spawn_queue]
+
+        for [slot, generation] in [handle for [handle, item] in self.spawn_queue]:
+            self.generations[slot] += 1
+            self.free_slots.append(slot)
+        for slot in self.slots:
+            self.index[slot] = None
+            self.generations[slot] += 1
+            self.free_slots.append(slot)
+
+        self.items = []
+        self.slots = []
+        self.spawn_queue = []
+        self.despawn_queue = []
+        self.despawn_set = set()
+        return removed
@@ -0,0 +1,96 @@
+# Output of frames straight into a Linux framebuffer device, such as /dev/fb1 on the GamePi20, without going through
+# SDL or fbcp. The framebuffer is memory mapped, each frame is converted to 16 bit RGB565 pixels in one batch of NumPy
+# maths, and only the scanlines that have changed since the last frame are written.
+#
+# Any file can be used as the framebuffer, as long as it is big enough, so this can be tested on a PC by using a plain
+# file, or a file in /dev/shm.
+
+import mmap
+import os
+import pygame                           # 2d games engine.
+
+import numpy_arrays                     # NumPy is needed for converting frames to RGB565.
+
+np = numpy_arrays.np
+
+
+# Bytes from the start of one scanline to the next in parm framebuffer device, such as '/dev/fb1', as told by its
+# driver in sysfs. Drivers can pad each scanline, so it isn't always 2 bytes times the width. Returns None if parm path
+# isn't a framebuffer device, such as a plain file used for testing. Raises ValueError if it isn't set to RGB565.
+def device_line_length(path, sysfs='/sys/class/graphics'):
+    name = os.path.basename(os.path.realpath(path))
+    folder = os.path.join(sysfs, name)
+    if not name.startswith('fb') or not os.path.isdir(folder):
+        return None
+
+    with open(os.path.join(folder, 'bits_per_pixel')) as f:
+        bits_per_pixel = int(f.read())
+    if bits_per_pixel != 16:
+        raise ValueError(path + ' is ' + str(bits_per_pixel) + ' bits per pixel, rather than 16 bit RGB565.')
+
+    with open(os.path.join(folder, 'stride')) as f:
+        return int(f.read())
+
+
+class FramebufferOutput:
+
+    def __init__(self, path, screen_size, line_length=None):
+        assert numpy_arrays.available()
+
+        [self.width, self.height] = screen_size
+        if line_length is None:
+            line_length = 2 * self.width                # Bytes from the start of one scanline to the next.
+
+        self.file = open(path, 'r+b')
+        self.map = mmap.mmap(self.file.fileno(), line_length * self.height)
+
+        # The framebuffer's memory, as rows of 16 bit pixels. Writing to this writes to the framebuffer.
+        self.pixels = np.ndarray((self.height, self.width), dtype='<u2', buffer=self.map,
+                                 strides=(line_length, 2))
+
+        self.shown = np.zeros((self.height, self.width), dtype=np.uint16)   # Copy of what is in the framebuffer.
+        self.pixels[:] = self.shown                     # Start from a black screen, so the copy is right.
+
+        self.frames = 0                                 # Counts of frames, and scanlines written, for tuning.
+        self.lines_written = 0
+
+    # Parm surface converted to an array of RGB565 pixels, one row per scanline.
+    def convert(self, surface):
+        rgb = pygame.surfarray.pixels3d(surface)        # Indexed [x, y], so is transposed to [y, x] below.
+        red = rgb[:, :, 0].T.astype(np.uint16, order='C')
+        green = rgb[:, :, 1].T.astype(np.uint16, order='C')
+        blue = rgb[:, :, 2].T.astype(np.uint16, order='C')
+        del rgb                                         # Unlocks the surface, so it can be drawn on again.
+        return (red >> 3) << 11 | (green >> 2) << 5 | blue >> 3
+
+    # Write the scanlines of parm surface that have changed since the last frame into the framebuffer. Returns the
+    # number of scanlines written.
+    def update(self, surface):
+        frame = self.convert(surface)
+        changed = np.flatnonzero((frame != self.shown).any(axis=1))
+
+        # Changed scanlines that are next to each other are written as one block.
+        start = 0
+        while start < len(changed):
+            end = start
+            while end + 1 < len(changed) and changed[end + 1] == changed[end] + 1:
+                end += 1
+            [top, bottom] = [changed[start], changed[end] + 1]
+            self.pixels[top:bottom] = frame[top:bottom]
+            start = end + 1
+
+        self.shown = frame
+        self.frames += 1
+        self.lines_written += len(changed)
+        return len(changed)
+
+    # Summary of how much of each frame has been written, on average.
+    def report(self):
+        if self.frames == 0:
+            return 'Framebuffer: no frames written.'
+        return 'Framebuffer: ' + str(round(self.lines_written / self.frames, 1)) + ' scanlines written per frame.'
+
+    def close(self):
+        del self.pixels                                 # Must be gone before the memory map can be closed.
+        self.map.close()
+        self.file.close()
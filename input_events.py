@@ -0,0 +1,189 @@
+# Key presses gathered as events, each with the time that it happened, rather than by looking at which keys are held
+# down once per tick. A tap of a key that is shorter than a tick is still seen, and the time from a key being pressed
+# to the next frame being drawn can be measured.
+#
+# Events come from a source,
+#   PygameSource    Key events from SDL. SDL only lets its events be read by the thread that opened the display, so
+#                   they are read by the game's own thread at the start of each tick, rather than by a thread of their
+#                   own.
+#   EvdevSource     Key and joystick events read by a thread from a Linux input device, such as the one made by the
+#                   GamePi20 joystick driver. Works in framebuffer mode, when SDL doesn't get any key presses.
+#   FakeSource      Scripted events, played out by a thread, for testing without a real device.
+
+import collections
+import os
+import pygame                           # 2d games engine.
+import select
+import struct
+import threading
+import time
+
+# Linux struct input_event: seconds, microseconds, type, code, value.
+EVENT = struct.Struct('llHHi')
+EV_KEY = 1
+EV_ABS = 3
+ABS_X = 0
+
+# Linux key and button codes, and the Pygame keys that they stand for.
+EVDEV_KEYS = {1: pygame.K_ESCAPE, 2: pygame.K_1, 3: pygame.K_2, 16: pygame.K_q, 30: pygame.K_a, 34: pygame.K_g,
+              44: pygame.K_z, 45: pygame.K_x, 53: pygame.K_SLASH, 105: pygame.K_LEFT, 106: pygame.K_RIGHT,
+              0x130: pygame.K_a,        # Joystick A button fires.
+              0x13a: pygame.K_ESCAPE,   # Select button ends the game.
+              0x13b: pygame.K_1}        # Start button starts a one player game.
+
+
+# Stands in for pygame.key.get_pressed(). Parm keys is a set of the keys that are pressed.
+class KeyState:
+
+    def __init__(self, keys):
+        self.keys = keys
+
+    def __getitem__(self, key):
+        return key in self.keys
+
+
+class InputQueue:
+
+    def __init__(self, source=None):
+        self.source = source
+        self.events = collections.deque()       # [time, key, pressed] of each event not yet seen by the game.
+        self.held = set()                       # Keys that are down.
+        self.quit = False                       # True if the window has been closed.
+
+        self.unseen_presses = []                # Times of key presses seen by the game, but not yet in a drawn frame.
+        self.latencies = []                     # Milliseconds from each key press to the next frame drawn.
+
+        if source is not None:
+            source.start(self)
+
+    # Add an event to the queue. Called by the sources, from any thread. Appending to a deque is thread safe.
+    def put(self, key, pressed, when=None):
+        if when is None:
+            when = time.perf_counter()
+        self.events.append([when, key, pressed])
+
+    # Keys pressed since the last call. A key counts as pressed if it is held down, or if it went down and came back
+    # up again since the last call, so that short taps aren't lost.
+    def keys(self):
+        if self.source is not None:
+            self.source.poll(self)
+
+        pressed = set(self.held)
+        while self.events:
+            [when, key, down] = self.events.popleft()
+            if down:
+                if key not in self.held:
+                    self.unseen_presses.append(when)
+                self.held.add(key)
+                pressed.add(key)
+            else:
+                self.held.discard(key)
+        return KeyState(pressed)
+
+    # A frame has just been drawn, so every key press seen so far is now on the screen.
+    def frame_drawn(self):
+        now = time.perf_counter()
+        for when in self.unseen_presses:
+            self.latencies.append(1000 * (now - when))
+        self.unseen_presses = []
+
+    # Summary of the time from key presses to frames.
+    def report(self):
+        if not self.latencies:
+            return 'Input: no key presses.'
+        ordered = sorted(self.latencies)
+        text = ('Input to frame latency: median ' + str(round(ordered[len(ordered) // 2], 1)) + ' ms, max '
+                + str(round(ordered[-1], 1)) + ' ms, over ' + str(len(ordered)) + ' key presses.')
+        if isinstance(self.source, PygameSource):
+            text += ' Timed from when SDL\'s events were read, so up to a tick less than from the key press itself.'
+        return text
+
+    def close(self):
+        if self.source is not None:
+            self.source.close()
+
+
+# Key events from SDL, read on the game's own thread. Pygame doesn't give the time that SDL got each event, so they are
+# timed from when they are read, at the start of a tick.
+class PygameSource:
+
+    def start(self, input_queue):
+        pass
+
+    def poll(self, input_queue):
+        for event in pygame.event.get():        # User did something
+            if event.type == pygame.QUIT:       # If user clicked close
+                input_queue.quit = True
+            elif event.type == pygame.KEYDOWN:
+                input_queue.put(event.key, True)
+            elif event.type == pygame.KEYUP:
+                input_queue.put(event.key, False)
+
+    def close(self):
+        pass
+
+
+# Events read by a thread from parm Linux input device, such as '/dev/input/event0'. The joystick's left and right
+# are the Z and X keys.
+class EvdevSource:
+
+    def __init__(self, path):
+        self.path = path
+        self.fd = None
+        self.running = False
+        self.thread = None
+
+    def start(self, input_queue):
+        self.fd = os.open(self.path, os.O_RDONLY | os.O_NONBLOCK)     # Only read when select() says there's data.
+        self.running = True
+        self.thread = threading.Thread(target=self.run, args=(input_queue,), daemon=True)
+        self.thread.start()
+
+    def run(self, input_queue):
+        while self.running:
+            # Wait for a short time only, so that the thread notices when it has been closed.
+            if not select.select([self.fd], [], [], 0.1)[0]:
+                continue
+            data = os.read(self.fd, EVENT.size)
+            if len(data) < EVENT.size:
+                return
+            [seconds, microseconds, event_type, code, value] = EVENT.unpack(data)
+
+            if event_type == EV_KEY and code in EVDEV_KEYS and value != 2:     # 2 is auto repeat.
+                input_queue.put(EVDEV_KEYS[code], value == 1)
+            elif event_type == EV_ABS and code == ABS_X:
+                input_queue.put(pygame.K_z, value < 0)
+                input_queue.put(pygame.K_x, value > 0)
+
+    def poll(self, input_queue):
+        pass
+
+    def close(self):
+        self.running = False
+        self.thread.join()
+        os.close(self.fd)
+
+
+# Plays out parm script on a thread. Each item of the script is [seconds after start, key, pressed].
+class FakeSource:
+
+    def __init__(self, script):
+        self.script = script
+        self.thread = None
+
+    def start(self, input_queue):
+        self.thread = threading.Thread(target=self.run, args=(input_queue,), daemon=True)
+        self.thread.start()
+
+    def run(self, input_queue):
+        start = time.perf_counter()
+        for [seconds, key, pressed] in self.script:
+            time.sleep(max(0, start + seconds - time.perf_counter()))
+            input_queue.put(key, pressed)
+
+    def poll(self, input_queue):
+        pass
+
+    # Wait for the whole script to have been played.
+    def close(self):
+        self.thread.join()
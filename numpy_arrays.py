@@ -0,0 +1,28 @@
+# NumPy, which is optional, and what is shared by the parts of the game that keep things in NumPy arrays: the rock
+# arrays, the explosion particles, the framebuffer output and the batch runner. Each of them uses numpy_arrays.np, and
+# checks numpy_arrays.available() before being used, so that NumPy is only looked for in one place.
+
+try:
+    import numpy as np                  # Optional. Without it, the game does everything one object at a time.
+except ImportError:
+    np = None
+
+
+# Is NumPy installed?
+def available():
+    return np is not None
+
+
+# Make parm object's arrays, whose attribute names are in parm names, bigger, so that they can hold at least parm
+# needed number of rows. The capacity is doubled until it is big enough, and the rows already in the arrays are kept.
+# Returns the new capacity.
+def grow(obj, names, capacity, needed):
+    while capacity < needed:
+        capacity *= 2
+
+    for name in names:
+        old = getattr(obj, name)
+        new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+        new[:len(old)] = old
+        setattr(obj, name, new)
+    return capacity
@@ -0,0 +1,104 @@
+# Particles of the rock and ship explosions. Every particle is a row of some NumPy arrays, so all of them are moved in
+# one batch of array maths per tick, and drawn by writing straight into the pixels of the screen, or as part of the
+# render queue's batch of blits, rather than by one pygame.draw.circle() call per particle.
+
+import pygame                           # 2d games engine.
+
+import numpy_arrays                     # Optional NumPy. Without it, explosions are drawn one particle at a time.
+
+np = numpy_arrays.np
+
+
+class ParticleSystem:
+
+    def __init__(self, capacity):
+        assert numpy_arrays.available()
+
+        self.capacity = capacity                            # Max number of particles before arrays must be grown.
+        self.count = 0                                      # Number of live particles. They are rows 0 to count - 1.
+
+        self.positions = np.zeros((capacity, 2))            # [x, y] coordinates of each particle.
+        self.velocities = np.zeros((capacity, 2))           # Amount each particle moves by per tick.
+        self.lives = np.zeros(capacity, dtype=int)          # Ticks left before each particle disappears.
+        self.colours = np.zeros((capacity, 3), dtype=int)   # Colour of each particle, when not in monochrome.
+
+    # Make the arrays bigger, so that they can hold at least parm number of particles.
+    def grow(self, needed):
+        self.capacity = numpy_arrays.grow(self, ['positions', 'velocities', 'lives', 'colours'], self.capacity, needed)
+
+    # Add particles that start at parm origin, one for each of parm velocities and lives.
+    def emit(self, origin, velocities, lives, colour):
+        start = self.count
+        end = start + len(velocities)
+        if end > self.capacity:
+            self.grow(end)
+
+        self.positions[start:end] = origin
+        self.velocities[start:end] = velocities
+        self.lives[start:end] = lives
+        self.colours[start:end] = colour
+        self.count = end
+
+    # Move every particle by one tick, and remove the ones that have reached the end of their lives.
+    def update(self):
+        n = self.count
+        self.positions[:n] += self.velocities[:n]
+        self.lives[:n] -= 1
+
+        alive = np.flatnonzero(self.lives[:n] > 0)
+        if len(alive) < n:                                  # Pack the live particles into the first rows.
+            for array in [self.positions, self.velocities, self.lives, self.colours]:
+                array[:len(alive)] = array[alive]
+            self.count = len(alive)
+
+    def clear(self):
+        self.count = 0
+
+    # Add every particle to the render queue.
+    def draw(self, config):
+        n = self.count
+        if n == 0:
+            return
+
+        positions = self.positions[:n]
+        if config.lag:                  # Drawing is lagging behind the game logic, so draw them part way back.
+            positions = positions - config.lag * self.velocities[:n]
+        xy = (positions - config.camera).astype(int)     # Screen coordinates.
+
+        # Only particles that are far enough inside the screen for the whole of their dot to be drawn.
+        radius = 1 if config.monochrome else 4
+        [width, height] = config.screen.get_size()
+        onscreen = ((xy[:, 0] >= radius) & (xy[:, 0] < width - radius)
+                    & (xy[:, 1] >= radius) & (xy[:, 1] < height - radius))
+        x = xy[onscreen, 0]
+        y = xy[onscreen, 1]
+
+        # Monochrome particles are tiny crosses, written straight into the screen's pixels. Can't be done to a 24 bit
+        # screen, so then they are blitted like the coloured ones.
+        if config.monochrome and config.screen.get_bytesize() != 3:
+            config.render_queue.custom(self.write_crosses, [config.WHITE, x, y])
+            return
+
+        # Otherwise, one blit of a pre-drawn dot per particle, all done with the render queue's other blits.
+        if config.monochrome:
+            colours = [config.WHITE] * len(x)
+        else:
+            colours = [tuple(colour) for colour in self.colours[:n][onscreen].tolist()]
+
+        # The render queue takes world coordinates, and moves them by the camera itself.
+        [camera_x, camera_y] = config.camera
+        for px, py, colour in zip(x.tolist(), y.tolist(), colours):
+            config.render_queue.dot(config.screen, colour, [px + camera_x, py + camera_y], radius, 0)
+
+    # Write a cross of parm colour into parm screen's pixels at each of parm x, y coordinates. Returns a list of the
+    # rectangles of the screen that were drawn on.
+    def write_crosses(self, screen, colour, x, y):
+        pixels = pygame.surfarray.pixels2d(screen)
+        mapped = screen.map_rgb(colour)
+        pixels[x, y] = mapped
+        pixels[x - 1, y] = mapped
+        pixels[x + 1, y] = mapped
+        pixels[x, y - 1] = mapped
+        pixels[x, y + 1] = mapped
+        del pixels                                          # Unlocks the screen, so it can be drawn on again.
+        return [pygame.Rect(px - 1, py - 1, 3, 3) for px, py in zip(x.tolist(), y.tolist())]
@@ -0,0 +1,95 @@
+# Timing of each phase of a frame (moving things, collision detection, drawing, etc.), so that when the frame rate
+# drops it is possible to see which phase is using up the time.
+
+import collections
+import csv
+import json
+import time
+
+
+class FrameProfiler:
+
+    def __init__(self, window):
+        self.window = window                                # Number of recent frames that statistics are over.
+        self.samples = collections.OrderedDict()            # Key is phase name, value is deque of recent seconds.
+        self.phase = None                                   # Name of phase currently being timed.
+        self.phase_start = 0                                # When current phase started, from time.perf_counter().
+
+    # Start timing parm phase. If another phase is being timed, it is stopped first.
+    def start(self, phase):
+        now = time.perf_counter()
+        if self.phase is not None:
+            self.record(self.phase, now - self.phase_start)
+        self.phase = phase
+        self.phase_start = now
+
+    # Stop timing the current phase.
+    def stop(self):
+        if self.phase is not None:
+            self.record(self.phase, time.perf_counter() - self.phase_start)
+            self.phase = None
+
+    # Add a duration in seconds to the recent history of parm phase.
+    def record(self, phase, seconds):
+        if phase not in self.samples:
+            self.samples[phase] = collections.deque(maxlen=self.window)
+        self.samples[phase].append(seconds)
+
+    # Statistics for each phase, in milliseconds. Key is phase name, value is dictionary of p50, p95 and max.
+    def statistics(self):
+        stats = collections.OrderedDict()
+        for phase, samples in self.samples.items():
+            ordered = sorted(samples)
+            stats[phase] = {'p50': round(1000 * ordered[int(0.50 * (len(ordered) - 1))], 3),
+                            'p95': round(1000 * ordered[int(0.95 * (len(ordered) - 1))], 3),
+                            'max': round(1000 * ordered[-1], 3)}
+        return stats
+
+    # Draw the p95 of each phase in a column, with its bottom at parm y coordinate.
+    # Returns a list of the rectangles of the screen that were drawn on.
+    def draw_overlay(self, config, x, y):
+        stats = self.statistics()
+        line_height = config.overlay_font.get_linesize()
+        top = y - line_height * len(stats)
+
+        drawn = []
+        for n, (phase, phase_stats) in enumerate(stats.items()):
+            text = phase[:10].ljust(10) + ' ' + str(phase_stats['p95']).rjust(6)
+            surface = config.overlay_text_cache.render(text, config.WHITE)
+            drawn.append(config.screen.blit(surface, (x, top + n * line_height)))
+        return drawn
+
+    # Save the statistics to parm file. A filename ending in .csv gives CSV, anything else gives JSON.
+    def save(self, filename):
+        stats = self.statistics()
+
+        with open(filename, 'w', newline='') as f:
+            if filename.endswith('.csv'):
+                writer = csv.writer(f)
+                writer.writerow(['phase', 'p50_ms', 'p95_ms', 'max_ms'])
+                for phase, phase_stats in stats.items():
+                    writer.writerow([phase, phase_stats['p50'], phase_stats['p95'], phase_stats['max']])
+            else:
+                json.dump(stats, f, indent=2)
+
+
+# Timings of each stage of starting up the game, so that it is possible to see what is delaying the first frame.
+class StartupTimer:
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.latest = self.start                            # When the latest stage finished.
+        self.stages = []                                    # [name, seconds] of each stage, in order.
+
+    # Record that parm stage has just finished.
+    def stage(self, name):
+        now = time.perf_counter()
+        self.stages.append([name, now - self.latest])
+        self.latest = now
+
+    # Lines of text, one per stage, plus the total.
+    def report(self):
+        lines = []
+        for name, seconds in self.stages + [['total', self.latest - self.start]]:
+            lines.append('Startup ' + name.ljust(12) + str(round(1000 * seconds, 1)).rjust(8) + ' ms')
+        return lines
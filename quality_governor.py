@@ -0,0 +1,76 @@
+# Adjusts the amount of work the game does each frame to suit the speed of the computer. The time taken by recent frames
+# is watched, and if they are going over budget, the game drops down a quality level (fewer rocks, simpler explosions,
+# etc.). If there is plenty of time to spare, it goes back up a level.
+
+import collections
+
+# Quality levels, lowest first. Level 3 is the setting that the game was hand tuned to for the Pi Zero, except that it
+# has the original 72 particle ship explosion, as particles are cheap when drawn by a particles.ParticleSystem. Level 4
+# has the rest of the settings of the original version of Space Rocks, for computers that can cope with them.
+#   num_rocks           Target number of rocks to have on screen at once.
+#   explosion_vertices  Number of particles in a ship explosion.
+#   rock_vertex_step    Rocks are drawn using every nth vertex of their outline. Collisions still use all of them.
+#   hud_refresh         Score, time and FPS texts are worked out every nth frame.
+# The number of bullets a ship can have in flight is a rule of the game, not a quality setting, so it is the same at
+# every level.
+LEVELS = [{'num_rocks': 6, 'explosion_vertices': 24, 'rock_vertex_step': 3, 'hud_refresh': 5},
+          {'num_rocks': 9, 'explosion_vertices': 36, 'rock_vertex_step': 2, 'hud_refresh': 3},
+          {'num_rocks': 12, 'explosion_vertices': 72, 'rock_vertex_step': 2, 'hud_refresh': 2},
+          {'num_rocks': 15, 'explosion_vertices': 72, 'rock_vertex_step': 1, 'hud_refresh': 1},
+          {'num_rocks': 20, 'explosion_vertices': 72, 'rock_vertex_step': 1, 'hud_refresh': 1}]
+
+# Without NumPy there is no particles.ParticleSystem, so each particle of a ship explosion is drawn by its own call, and
+# the levels go back to the smaller explosions that the game was hand tuned with.
+LEVELS_WITHOUT_PARTICLES = [dict(level, explosion_vertices=vertices)
+                            for level, vertices in zip(LEVELS, [8, 12, 15, 20, 72])]
+DEFAULT_LEVEL = 3
+
+
+class QualityGovernor:
+
+    def __init__(self, levels, level, budget_ms, window, headroom, max_level=None):
+        self.levels = levels
+        self.level = level                              # Index into levels of the current quality level.
+
+        # Highest level that the governor will go up to. None means the top of levels.
+        self.max_level = len(levels) - 1 if max_level is None else max_level
+        self.budget_ms = budget_ms                      # Most milliseconds of work that a frame should take.
+        self.window = window                            # Number of frames that are looked at before changing level.
+
+        # Quality goes up a level when frames take less than this fraction of the budget.
+        self.headroom = headroom
+
+        self.work_ms = collections.deque(maxlen=window)     # Milliseconds of work done in each recent frame.
+        self.ms_at_level = [0] * len(levels)                # Total milliseconds spent at each level.
+        self.changes = 0                                    # Number of times that the level has changed.
+
+    # Settings of the current quality level.
+    def settings(self):
+        return self.levels[self.level]
+
+    # Record the parm milliseconds of work that the latest frame took, and parm total milliseconds of the frame,
+    # including any time spent waiting. Returns True if the quality level has changed.
+    def record(self, work_ms, frame_ms):
+        self.ms_at_level[self.level] += frame_ms
+        self.work_ms.append(work_ms)
+        if len(self.work_ms) < self.window:
+            return False
+
+        # Median, so that one slow frame (while a screenshot is saved, for example) doesn't change the level.
+        typical = sorted(self.work_ms)[len(self.work_ms) // 2]
+
+        if typical > self.budget_ms and self.level > 0:
+            self.level -= 1
+        elif typical < self.headroom * self.budget_ms and self.level < self.max_level:
+            self.level += 1
+        else:
+            return False
+
+        self.work_ms.clear()                            # The new level is judged only on frames done at that level.
+        self.changes += 1
+        return True
+
+    # Summary of how long has been spent at each quality level.
+    def report(self):
+        return 'Seconds at each quality level: ' + ', '.join(str(level) + '=' + str(round(ms / 1000, 1))
+                                                             for level, ms in enumerate(self.ms_at_level))
@@ -0,0 +1,141 @@
+# Ways of getting each frame's drawing onto the screen with as little work as possible.
+
+import pygame                           # 2d games engine.
+
+
+# Keeps track of which rectangles of the screen were drawn on in the previous frame. Each frame, only those rectangles
+# are cleared, and only they plus the rectangles drawn on in this frame are sent to the display. Most of the screen
+# is empty space, so this is a lot less than the whole screen.
+class DirtyRects:
+
+    def __init__(self, screen_size, threshold):
+        self.screen_area = screen_size[0] * screen_size[1]
+        self.threshold = threshold              # If more than this fraction of screen is dirty, just flip it all.
+        self.previous = None                    # Rectangles drawn on last frame. None means whole screen.
+
+        self.full_flips = 0                     # Counts of each kind of display update, for tuning the threshold.
+        self.partial_updates = 0
+
+    # Clear the parts of the screen that were drawn on last frame.
+    def erase(self, screen, colour):
+        if self.previous is None:
+            screen.fill(colour)
+        else:
+            for rect in self.previous:
+                screen.fill(colour, rect)
+
+    # Send the parts of the screen that have changed to the display. Parm drawn is a list of the rectangles drawn on
+    # this frame.
+    def update(self, drawn):
+        current = list(drawn)
+
+        if self.previous is None:
+            pygame.display.flip()
+            self.full_flips += 1
+        else:
+            changed = self.previous + current
+
+            # Overlapping rectangles are counted twice, so this can over estimate, which is the safe way round.
+            dirty_area = sum(rect.width * rect.height for rect in changed)
+            if dirty_area > self.threshold * self.screen_area:
+                pygame.display.flip()
+                self.full_flips += 1
+            else:
+                pygame.display.update(changed)
+                self.partial_updates += 1
+
+        self.previous = current
+
+
+# Everything to be drawn in a frame, collected from the rocks, ships, bullets and particles, then drawn in as few calls
+# to Pygame as possible. Each shape is one call, with its vertices worked out once, rather than one call per edge or
+# per triangle. Blits of sprites and dots that come one after another are all done by a single Surface.blits() call.
+class RenderQueue:
+
+    def __init__(self):
+        self.commands = []                      # [kind, ...] of each thing to draw, in the order they are drawn.
+        self.dots = {}                          # Key is (colour, radius, width), value is surface with a dot on it.
+
+        # World coordinates of the top left corner of the screen. Everything queued is in world coordinates, and is
+        # moved by this much to get screen coordinates.
+        self.camera = [0, 0]
+
+        self.frames = 0                         # Counts of frames and draw calls, to find the calls per frame.
+        self.calls = 0
+        self.last_calls = 0                     # Draw calls in the latest frame.
+
+    # Parm list of world coordinates, as screen coordinates.
+    def to_screen(self, vertices):
+        [x, y] = self.camera
+        if x == 0 and y == 0:
+            return vertices
+        return [[vx - x, vy - y] for [vx, vy] in vertices]
+
+    # Outline of the polygon with parm vertices.
+    def outline(self, colour, vertices):
+        self.commands.append(['lines', colour, self.to_screen(vertices)])
+
+    # Filled polygon with parm vertices.
+    def fill(self, colour, vertices):
+        self.commands.append(['polygon', colour, self.to_screen(vertices)])
+
+    # Parm surface, with its top left corner at parm position.
+    def blit(self, surface, position):
+        self.commands.append(['blit', surface, (position[0] - self.camera[0], position[1] - self.camera[1])])
+
+    # Drawing that can't be done by the other kinds. Parm function is called with the screen and parm args when its
+    # turn comes, and returns a list of the rectangles that it drew on.
+    def custom(self, function, args):
+        self.commands.append(['custom', function, args])
+
+    # Circle of parm radius and line width centred on parm integer coordinates. A width of 0 is filled.
+    def dot(self, screen, colour, centre, radius, width):
+        key = (tuple(colour), radius, width)
+        if key not in self.dots:
+            surface = pygame.Surface([2 * radius + 1, 2 * radius + 1], 0, screen)
+            surface.set_colorkey((0, 0, 0))     # Black is transparent when the dot is blitted.
+            pygame.draw.circle(surface, colour, [radius, radius], radius, width)
+            self.dots[key] = surface
+        self.commands.append(['blit', self.dots[key], (centre[0] - radius - self.camera[0],
+                                                       centre[1] - radius - self.camera[1])])
+
+    # Draw everything that has been queued onto parm screen, and empty the queue. Returns a list of the rectangles of
+    # the screen that were drawn on.
+    def submit(self, screen):
+        drawn = []
+        blits = []
+        calls = 0
+
+        for [kind, a, b] in self.commands:
+            if kind == 'blit':
+                blits.append((a, b))
+                continue
+
+            if blits:                           # Blits waiting to be done go before this shape, so it is on top.
+                drawn.extend(screen.blits(blits))
+                blits = []
+                calls += 1
+
+            if kind == 'lines':
+                drawn.append(pygame.draw.lines(screen, a, True, b, 1))
+            elif kind == 'polygon':
+                drawn.append(pygame.draw.polygon(screen, a, b, 0))
+            else:
+                drawn.extend(a(screen, *b))
+            calls += 1
+
+        if blits:
+            drawn.extend(screen.blits(blits))
+            calls += 1
+
+        self.commands = []
+        self.frames += 1
+        self.calls += calls
+        self.last_calls = calls
+        return drawn
+
+    # Summary of the number of draw calls made per frame, on average.
+    def report(self):
+        if self.frames == 0:
+            return 'Render queue: no frames drawn.'
+        return 'Render queue: ' + str(round(self.calls / self.frames, 1)) + ' draw calls per frame.'
@@ -0,0 +1,158 @@
+# Recordings of the keys pressed in each tick of a game, so that the game can be played again exactly, without anyone at
+# the controls. Playback is headless, and runs as fast as the computer can go, so a game that had a slow patch can be
+# played again under the profiler or the benchmark.
+#
+# A recording is a header, followed by runs. Keys are usually held down for many ticks in a row, so rather than storing
+# the keys for every tick, each run is the state of the keys plus the number of ticks in a row that it lasted for.
+# Runs are written to the file as the game goes along, so a long game isn't held in memory.
+#
+# To play back a recording,
+#   python replay.py replays/replay0001.bin [--render] [--profile]
+
+import argparse
+import pygame                           # 2d games engine.
+import space_rocks
+import struct
+import sys
+import time
+
+MAGIC = b'SRR1'
+
+# Magic, seed the config was made with, seed the game started with, target FPS, number of players, quality level.
+HEADER = struct.Struct('<4sIIBBB')
+
+# State (key bits in the low byte, quality level in the high byte), number of ticks in a row with that state.
+RUN = struct.Struct('<HH')
+MAX_RUN = 65535
+
+# Keys that are recorded. Key n is bit n of the key bits.
+KEYS = [pygame.K_z, pygame.K_x, pygame.K_a, pygame.K_LEFT, pygame.K_RIGHT, pygame.K_SLASH, pygame.K_ESCAPE]
+
+
+# Bits of the recorded keys that are pressed in parm key state, such as from pygame.key.get_pressed().
+def key_bits(keys):
+    bits = 0
+    for n, key in enumerate(KEYS):
+        if keys[key]:
+            bits |= 1 << n
+    return bits
+
+
+# Stands in for pygame.key.get_pressed() when a recording is played back. Keys that aren't recorded are never pressed.
+class RecordedKeys:
+
+    def __init__(self, bits):
+        self.bits = bits
+
+    def __getitem__(self, key):
+        return key in KEYS and self.bits & (1 << KEYS.index(key)) != 0
+
+
+class Recorder:
+
+    def __init__(self, filename, config):
+        self.file = open(filename, 'wb')
+        self.file.write(HEADER.pack(MAGIC, config.seed, config.game_seed, config.target_fps, config.num_players,
+                                    config.governor.level))
+        self.state = None                       # State of the current run.
+        self.run_length = 0                     # Number of ticks in the current run so far.
+        self.ticks = 0                          # Total number of ticks recorded.
+
+    # Record parm key state, and parm quality level, for one tick.
+    def record(self, keys, level):
+        state = key_bits(keys) | level << 8
+        if state != self.state or self.run_length == MAX_RUN:
+            self.write_run()
+            self.state = state
+        self.run_length += 1
+        self.ticks += 1
+
+    def write_run(self):
+        if self.run_length > 0:
+            self.file.write(RUN.pack(self.state, self.run_length))
+        self.run_length = 0
+
+    def close(self):
+        self.write_run()
+        self.file.close()
+
+
+class Recording:
+
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, 'rb') as f:
+            [magic, self.config_seed, self.game_seed, self.target_fps, self.num_players, self.level] = \
+                HEADER.unpack(f.read(HEADER.size))
+        assert magic == MAGIC, filename + ' is not a Space Rocks recording.'
+
+    # Key state and quality level of each tick, in order. Read from the file a run at a time.
+    def ticks(self):
+        with open(self.filename, 'rb') as f:
+            f.seek(HEADER.size)
+            while True:
+                data = f.read(RUN.size)
+                if len(data) < RUN.size:
+                    return
+                [state, run_length] = RUN.unpack(data)
+                keys = RecordedKeys(state & 0xff)
+                for t in range(run_length):
+                    yield keys, state >> 8
+
+
+# Make a headless game, set up the same as the recorded game was when it started.
+def make_game(recording, render):
+    config = space_rocks.Config(False, recording.target_fps, headless=True, seed=recording.config_seed)
+    config.render = render
+    config.num_players = recording.num_players
+    config.governor.level = recording.level
+    config.quality = config.governor.settings()
+
+    config.game_seed = recording.game_seed
+    config.random.seed(recording.game_seed)
+    this_game = space_rocks.Game(config)
+    config.demo_mode = False
+    return this_game
+
+
+# Feed the recorded keys into parm game, one tick at a time. Returns the number of ticks played.
+def play_ticks(recording, this_game):
+    ticks = 0
+    for keys, level in recording.ticks():
+        if level != this_game.config.governor.level:
+            this_game.config.governor.level = level
+            this_game.change_quality()
+
+        this_game.key_handling(keys)
+        this_game.animate_1_tick()
+        ticks += 1
+    return ticks
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Play back a recorded game of Space Rocks, as fast as possible.')
+    parser.add_argument('filename', help='Recording to play back.')
+    parser.add_argument('--render', action='store_true', help='Draw each frame, into memory.')
+    parser.add_argument('--profile', action='store_true', help='Print timings of each phase, and save them.')
+    args = parser.parse_args()
+
+    recording = Recording(args.filename)
+    this_game = make_game(recording, args.render)
+
+    start = time.perf_counter()
+    ticks = play_ticks(recording, this_game)
+    seconds = time.perf_counter() - start
+
+    print('Ticks', ticks, 'in', round(seconds, 3), 'seconds,', round(ticks / seconds), 'ticks per second.')
+    print('Score', [p.score for p in this_game.players])
+
+    if args.profile:
+        for phase, phase_stats in this_game.config.profiler.statistics().items():
+            print(phase.ljust(15), phase_stats)
+        this_game.config.profiler.save(this_game.config.profile_file)
+        print('Timings saved to', this_game.config.profile_file)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,118 @@
+# Struct-of-arrays store for the rocks, so that moving them, checking whether they are onscreen, and calculating the
+# screen coordinates of their vertices can each be done as a single batch of NumPy maths per tick.
+
+import numpy_arrays                     # Optional NumPy. Without it, each rock is moved by its own Python code.
+
+np = numpy_arrays.np
+
+
+class RockArrays:
+
+    def __init__(self, capacity, vertex_count):
+        assert numpy_arrays.available()
+
+        self.capacity = capacity                            # Max number of rocks before the arrays must be grown.
+        self.vertex_count = vertex_count                    # Number of vertices that make up each rock.
+        self.rocks = []                                     # Rock objects, in same order as rows of the arrays.
+        self.reuses = []                                    # Reuse count of each of those rocks, when loaded.
+
+        self.coords = np.zeros((capacity, 2))               # [x, y] coordinates of each rock.
+        self.drift = np.zeros((capacity, 2))                # Amount each rock moves by per tick.
+        self.rotation = np.zeros(capacity, dtype=int)       # Current rotation of each rock in degrees.
+        self.rotation_speed = np.zeros(capacity, dtype=int) # Degrees per tick.
+        self.vertices = np.zeros((capacity, vertex_count, 2))   # Vertices of each rock, centered around origin.
+
+    # Make the arrays bigger, so that they can hold at least parm number of rocks.
+    def grow(self, needed):
+        self.capacity = numpy_arrays.grow(self, ['coords', 'drift', 'rotation', 'rotation_speed', 'vertices'],
+                                          self.capacity, needed)
+
+    # Make the rows of the arrays match the parm list of rocks. Only rocks that are not already in the right row are
+    # copied in, so a tick in which no rocks were created or removed costs nothing here. A Rock object that has been
+    # reused by the pool since it was loaded is a different rock, so it is copied in again.
+    def load(self, rocks):
+        if len(rocks) > self.capacity:
+            self.grow(len(rocks))
+
+        for row, rock in enumerate(rocks):
+            if row < len(self.rocks) and self.rocks[row] is rock and self.reuses[row] == rock.reuses:
+                continue
+
+            self.coords[row] = rock.coords
+            self.drift[row] = rock.drift
+            self.rotation[row] = rock.rotation
+            self.rotation_speed[row] = rock.rotation_speed
+            self.vertices[row] = rock.vertices
+
+        self.rocks = list(rocks)
+        self.reuses = [rock.reuses for rock in rocks]
+
+    # Move every rock by one tick.
+    def move(self):
+        n = len(self.rocks)
+        self.coords[:n] += self.drift[:n]
+        self.rotation[:n] += self.rotation_speed[:n]
+
+    # Row numbers of the rocks that have strayed outside of the game screen plus its border.
+    def offscreen_rows(self, config):
+        n = len(self.rocks)
+        x = self.coords[:n, 0]
+        y = self.coords[:n, 1]
+        return np.flatnonzero((x < config.left_dead) | (x > config.right_dead)
+                              | (y < config.top_dead) | (y > config.bottom_dead))
+
+    # Which of the rocks are more than config.far_distance outside of the screen, as an array of True / False.
+    def far_rows(self, config):
+        n = len(self.rocks)
+        x = self.coords[:n, 0] - config.camera[0]
+        y = self.coords[:n, 1] - config.camera[1]
+        return ((x < - config.far_distance) | (x > config.screen_size[0] + config.far_distance)
+                | (y < - config.far_distance) | (y > config.screen_size[1] + config.far_distance))
+
+    # Rotate and translate every vertex of the rocks in parm rows (default all of them) into game screen coordinates.
+    # Same maths as cc.rotate_around_origin, followed by cc.translation.
+    def world_vertices(self, rows=None):
+        if rows is None:
+            rows = slice(0, len(self.rocks))
+        radians = np.radians(self.rotation[rows])
+        cos = np.cos(radians)[:, np.newaxis]
+        sin = np.sin(radians)[:, np.newaxis]
+
+        x = self.vertices[rows, :, 0]
+        y = self.vertices[rows, :, 1]
+
+        world = np.empty((len(radians), self.vertex_count, 2))
+        world[:, :, 0] = x * cos + y * sin + self.coords[rows, 0, np.newaxis]
+        world[:, :, 1] = - x * sin + y * cos + self.coords[rows, 1, np.newaxis]
+        return world
+
+    # Do one tick of rock movement for the parm list of rocks. Results are copied back onto the Rock objects, so that
+    # the rest of the game can carry on using rock.coords, rock.kill, etc. If parm scrolling, the vertices of rocks
+    # that are far outside of the screen aren't worked out, as those rocks can't be seen or hit.
+    def move_rocks(self, rocks, config, scrolling=False):
+        self.load(rocks)
+        self.move()
+
+        n = len(self.rocks)
+        coords = self.coords[:n].tolist()
+        rotation = self.rotation[:n].tolist()
+
+        if not scrolling:
+            world = self.world_vertices().tolist()
+            for row, rock in enumerate(self.rocks):
+                rock.coords = coords[row]
+                rock.rotation = rotation[row]
+                rock.world_vertices = world[row]
+
+        else:
+            far = self.far_rows(config)
+            near_rows = np.flatnonzero(~far)
+            world = dict(zip(near_rows.tolist(), self.world_vertices(near_rows).tolist()))
+            for row, [rock, rock_far] in enumerate(zip(self.rocks, far.tolist())):
+                rock.coords = coords[row]
+                rock.rotation = rotation[row]
+                rock.far = rock_far
+                rock.world_vertices = None if rock_far else world[row]
+
+        for row in self.offscreen_rows(config):
+            self.rocks[row].kill = True
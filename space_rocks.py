@@ -1,9 +1,26 @@
 # Space Rocks game.
 
+import audio                            # Sound effects, with a cache of converted sounds.
 import cartesian_coordinates as cc      # Functions for rotating, scaling, etc.
+import entity_store                     # Lists of rocks and bullets that can be added to and removed from mid-tick.
+import framebuffer                      # Output of frames straight into a framebuffer device.
+import input_events                     # Key presses gathered as timestamped events.
+import numpy_arrays                     # Optional NumPy, used by the rock arrays and particles if it is installed.
+import particles                        # Optional NumPy particle system for explosions.
+import profiler                         # Timings of each phase of a frame.
+import quality_governor                 # Raises and lowers the quality of the game to suit the computer's speed.
+import renderer                         # Ways of getting drawing onto the screen quickly.
+import replay                           # Recording of the keys pressed, so that a game can be played again.
+import rock_arrays                      # Optional NumPy store for moving all rocks in one batch.
+import spatial_hash                     # Grid for speeding up collision detection.
+import sprite_cache                     # Pre-drawn sprites of the rocks and ship.
+import text_cache                       # Cache of rendered text.
+import tracer                           # Cheap log of events in the middle of a tick.
 import pygame                           # 2d games engine.
+import math
 import os
 import random
+import threading
 import time
 import datetime                         # Needed for logging.
 
@@ -18,96 +35,164 @@ def trace(config, message):
 # The rocks that float in space.
 ############################################
 
-class Rock:
+# The outline of a rock, centered around origin. Shapes are made ahead of time, and shared between rocks, so that no
+# rock has to work out its shape in the middle of a frame.
+class RockShape(cc.RotationCache):
 
     def __init__(self, config, size):
         assert size in ['Small', 'Medium', 'Large']
 
-        self.size = size                                    # Size of rock to be created, "Large", "Medium", "Small"
-        self.vertices = []                                  # List of vertices of the rock, centered around origin.
+        self.size = size                                    # Size of rock this shape is for.
 
         # Rock is based on a polygon (straight edged circle).
         if self.size == 'Large':
             # self.radius = random.randint(30, 50)
-            self.radius = random.randint(20, 35)
+            self.radius = config.random.randint(20, 35)
         elif self.size == "Medium":
             # self.radius = random.randint(15, 25)
-            self.radius = random.randint(10, 20)
+            self.radius = config.random.randint(10, 20)
         else:
             # self.radius = random.randint(10, 15)
-            self.radius = random.randint(7, 10)
-        self.rotation = 0                                   # Current rotation of the rock in degrees.
-
-        max_rotation_velocity = round(100 / config.target_fps)
-        self.rotation_speed = random.randint(- max_rotation_velocity, max_rotation_velocity) # Degrees per tick
-        if self.rotation_speed == 0:                        # No rotation would look boring.
-            self.rotation_speed = 1
+            self.radius = config.random.randint(7, 10)
 
         vertex_count = 12                                   # Number of vertices that will make up this rock.
         slice_size = 360 / vertex_count                     # Good for this to be an integer.
 
+        vertices = []
         for v_num in range(vertex_count):
             if self.size == "Large":
                 # vertex = [0, self.radius + random.randint(-15, 15)]
-                vertex = [0, self.radius + random.randint(-10, 10)]
+                vertex = [0, self.radius + config.random.randint(-10, 10)]
             elif self.size == "Medium":
                 # vertex = [0, self.radius + random.randint(-7, 7)]
-                vertex = [0, self.radius + random.randint(-4, 4)]
+                vertex = [0, self.radius + config.random.randint(-4, 4)]
             else:
                 # vertex = [0, self.radius + random.randint(-5, 5)]
-                vertex = [0, self.radius + random.randint(-3, 3)]
+                vertex = [0, self.radius + config.random.randint(-3, 3)]
+
+            vertex = cc.rotate_by_table(vertex, slice_size * v_num)
+            vertices.append(vertex)
+
+        cc.RotationCache.__init__(self, vertices)           # Cache of the shape's vertices at each rotation.
+
+        # Distance from centre of the rock to its furthest vertex. Nothing further away than this can be inside it.
+        self.bounding_radius = max(math.hypot(vertex[0], vertex[1]) for vertex in vertices)
+
+
+class Rock:
+
+    # Fixed set of attributes, rather than a dictionary per rock. Saves memory, and attribute access is quicker.
+    __slots__ = ['reuses', 'size', 'shape', 'vertices', 'radius', 'bounding_radius', 'rotation', 'rotation_speed',
+                 'kill', 'collision', 'exploding', 'explosion_step', 'colour', 'world_vertices', 'coords', 'drift',
+                 'far', 'idle_ticks']
+
+    def __init__(self, config, size, shape=None):
+        self.reuses = 0                                     # Number of times this object has been reused by the pool.
+        self.reset(config, size, shape)
+
+    # Make this into a new rock of parm size and shape. If no shape is given, a new one is made.
+    def reset(self, config, size, shape=None):
+        if shape is None:
+            shape = RockShape(config, size)
+        assert shape.size == size
+
+        self.size = size                                    # Size of rock to be created, "Large", "Medium", "Small"
+        self.shape = shape                                  # Shape of the rock, with cache of rotated vertices.
+        self.vertices = shape.vertices                      # List of vertices of the rock, centered around origin.
+        self.radius = shape.radius
+        self.bounding_radius = shape.bounding_radius
 
-            vertex = cc.rotate_around_origin(vertex, slice_size * v_num)
-            self.vertices.append(vertex)
+        self.rotation = 0                                   # Current rotation of the rock in degrees.
+
+        max_rotation_velocity = round(100 / config.target_fps)
+        self.rotation_speed = config.random.randint(- max_rotation_velocity, max_rotation_velocity) # Degrees per tick
+        if self.rotation_speed == 0:                        # No rotation would look boring.
+            self.rotation_speed = 1
 
         self.kill = False                                   # Should this rock be killed off?
         self.collision = False                              # Has the rock collided with something?
         self.exploding = False                              # Is the rock in the process of exploding?
         self.explosion_step = 0                             # Current step of explosion animation.
 
-        self.colour = (random.randint(60, 200), random.randint(60, 200), random.randint(60, 200))
+        self.colour = (config.random.randint(60, 200), config.random.randint(60, 200), config.random.randint(60, 200))
+
+        # Screen coordinates of the vertices, if they have been calculated in a batch for all rocks this tick.
+        self.world_vertices = None
 
-        trace(config, self.size + ' rock created.')           # Send trace info to stdout.
+        # In a world bigger than the screen, rocks far outside of the screen are only moved every few ticks.
+        self.far = False                                    # Is the rock far enough away to be moved less often?
+        self.idle_ticks = 0                                 # Ticks since the rock was last moved.
 
     def place_on_side_of_screen(self, config):
 
-        start_side = random.randint(1, 4)                   # 1=Top, 2=Bottom, 3=Left, 4=Right
+        start_side = config.random.randint(1, 4)                   # 1=Top, 2=Bottom, 3=Left, 4=Right
         assert start_side in [1, 2, 3, 4]
 
         if start_side == 1:                                 # From the top of screen.
             # TODO Try simplifying the first two in same style as second two.
 
-            self.coords = [random.randint(config.border, config.screen_size[0] - config.border), config.top_dead]
+            self.coords = [config.random.randint(config.border, config.screen_size[0] - config.border), config.top_dead]
 
             if self.coords[0] <= config.screen_size[0] / 2:    # Left hand side of top of screen.
-                self.drift = [10 * random.randint(1, 3) / config.target_fps,
-                              10 * random.randint(1, 3) / config.target_fps]   # So drift rightwards and downwards.
+                self.drift = [10 * config.random.randint(1, 3) / config.target_fps,
+                              10 * config.random.randint(1, 3) / config.target_fps]   # So drift rightwards and downwards.
             else:
-                self.drift = [10 * random.randint(-3, -1) / config.target_fps,
-                              10 * random.randint(1, 3) / config.target_fps]     # Otherwise drift leftwards and downwards.
+                self.drift = [10 * config.random.randint(-3, -1) / config.target_fps,
+                              10 * config.random.randint(1, 3) / config.target_fps]     # Otherwise drift leftwards and downwards.
 
         if start_side == 2:                                 # Bottom
-            self.coords = [random.randint(config.border, config.screen_size[0] - config.border), config.bottom_dead]
+            self.coords = [config.random.randint(config.border, config.screen_size[0] - config.border), config.bottom_dead]
 
             if self.coords[0] <= config.screen_size[0] / 2:    # Left hand side of top of screen.
-                self.drift = [10 * random.randint(1, 3) / config.target_fps,
-                              10 * random.randint(-3, -1) / config.target_fps]   # So drift rightwards and upwards.
+                self.drift = [10 * config.random.randint(1, 3) / config.target_fps,
+                              10 * config.random.randint(-3, -1) / config.target_fps]   # So drift rightwards and upwards.
             else:
-                self.drift = [10 * random.randint(-3, -1) / config.target_fps,
-                              10 * random.randint(-3, -2) / config.target_fps]     # Otherwise drift leftwards and upwards.
+                self.drift = [10 * config.random.randint(-3, -1) / config.target_fps,
+                              10 * config.random.randint(-3, -2) / config.target_fps]     # Otherwise drift leftwards and upwards.
 
         if start_side == 3:
             # self.coords = [-100, random.randint(200, 400)]
-            self.coords = [-75, random.randint(75, 150)]
+            self.coords = [-75, config.random.randint(75, 150)]
 
-            self.drift = [10 * random.randint(2, 3) / config.target_fps,
-                          10 * random.randint(-3, 3) / config.target_fps]
+            self.drift = [10 * config.random.randint(2, 3) / config.target_fps,
+                          10 * config.random.randint(-3, 3) / config.target_fps]
 
         if start_side == 4:
             # self.coords = [900, random.randint(200, 400)]
-            self.coords = [400, random.randint(75, 150)]
-            self.drift = [10 * random.randint(-3, -2) / config.target_fps,
-                          10 * random.randint(-3, 3) / config.target_fps]
+            self.coords = [400, config.random.randint(75, 150)]
+            self.drift = [10 * config.random.randint(-3, -2) / config.target_fps,
+                          10 * config.random.randint(-3, 3) / config.target_fps]
+
+    # Put the rock on a random edge of a world that is bigger than the screen, drifting into it.
+    def place_on_edge_of_world(self, config):
+        [width, height] = config.world_size
+        across = 10 * config.random.randint(-3, 3) / config.target_fps      # Drift along the edge.
+        inwards = 10 * config.random.randint(1, 3) / config.target_fps      # Drift into the world.
+
+        start_side = config.random.randint(1, 4)                   # 1=Top, 2=Bottom, 3=Left, 4=Right
+        if start_side == 1:
+            self.coords = [config.random.randint(0, width), config.top_dead]
+            self.drift = [across, inwards]
+        elif start_side == 2:
+            self.coords = [config.random.randint(0, width), config.bottom_dead]
+            self.drift = [across, - inwards]
+        elif start_side == 3:
+            self.coords = [config.left_dead, config.random.randint(0, height)]
+            self.drift = [inwards, across]
+        else:
+            self.coords = [config.right_dead, config.random.randint(0, height)]
+            self.drift = [- inwards, across]
+
+    # Put the rock anywhere in a world that is bigger than the screen, other than on the screen itself, drifting in a
+    # random direction. Used for the rocks that a game starts with.
+    def place_in_world(self, config):
+        while True:
+            self.coords = [config.random.randint(0, config.world_size[0]),
+                           config.random.randint(0, config.world_size[1])]
+            if config.is_far(self.coords, config.border):
+                break
+        self.drift = [10 * config.random.randint(-3, 3) / config.target_fps,
+                      10 * config.random.randint(-3, 3) / config.target_fps]
 
     # Has the rock strayed outside of the game screen? If so, it is flagged to be killed off.
     def check_onscreen(self, config):
@@ -119,39 +204,35 @@ class Rock:
 
     # Is the parm vertex inside the rock?
     def check_collision(self, vertex):
-        # TODO Try omitting this line of code, as this attribute was set to False when object created.
-        self.collision = False                      # Start by assuming that vertex is outside all triangles.
-
-        # Before doing the triangle analysis (which is time consuming), do a simpler clipping test.
-        # Imagine a square around the centre of the rock. Is the vertex inside that square?
-        # if (vertex[0] > self.coords[0] - self.radius - 15       # 15 is the most that can randomly be added to a vertex
-        # and vertex[0] < self.coords[0] + self.radius + 15       # at the time that the rock was created.
-        # and vertex[1] > self.coords[1] - self.radius - 15
-        # and vertex[1] < self.coords[1] + self.radius + 15):
-        if (vertex[0] > self.coords[0] - self.radius - 10  # 10 is the most that can randomly be added to a vertex
-        and vertex[0] < self.coords[0] + self.radius + 10  # at the time that the rock was created.
-        and vertex[1] > self.coords[1] - self.radius - 10
-        and vertex[1] < self.coords[1] + self.radius + 10):
-
-            # If the vertex is inside the square, then it is worth checking each triangle that makes up the
-            # rock in turn, to see if the vertex is inside any of them.
-            prev_vertex = self.vertices[-1]  # This is so we have 3 points for first triangle.
-
-            for triangle_vertex in self.vertices:
-                if cc.is_inside_triangle(vertex, self.position(prev_vertex), self.position(triangle_vertex), self.coords):
-                    self.collision = True
-                prev_vertex = triangle_vertex
+        self.collision = self.check_collisions([vertex])[0]
+
+    # Which of the parm vertices are inside the rock? Returns a list of booleans, one per vertex.
+    # The rock's screen coordinates are worked out once, however many vertices are being checked.
+    def check_collisions(self, vertices):
+        return cc.are_inside_fan(vertices, self.coords, self.outline(), self.bounding_radius)
 
     # Apply some transformations to calculate the coordinates of the rock's parm vertex on the game screen.
     def position(self, vertex):
-        rotated = cc.rotate_around_origin(vertex, self.rotation)
+        rotated = cc.rotate_by_table(vertex, self.rotation)
         return cc.translation(rotated, self.coords)
 
+    # Coordinates of all of the rock's vertices on the game screen.
+    def outline(self):
+        if self.world_vertices is not None:                 # Already calculated in a batch with the other rocks.
+            return self.world_vertices
+        return [cc.translation(vertex, self.coords) for vertex in self.shape.rotated(self.rotation)]
+
     # Begin the process of exploding this rock.
     def explode(self, config):
         self.exploding = True                               # Flag it as exploding.
         config.explosion_channel.play(config.explosion_sound)   # Play explosion sound.
 
+        # One particle per vertex, flying out from the centre of the rock, while still drifting along with the rock.
+        if config.particles is not None:
+            vertices = self.shape.rotated(self.rotation)[::config.quality['rock_vertex_step']]
+            velocities = [cc.translation(cc.scale(vertex, 5 / config.target_fps), self.drift) for vertex in vertices]
+            config.particles.emit(self.coords, velocities, int(config.target_fps / 4) + 1, self.colour)
+
     # Continue animation of rock's explosion.
     def animate_explosion(self, game):
         # if self.explosion_step < game.config.target_fps:           # Higher FPS mean, more animation steps for explosion!
@@ -166,63 +247,76 @@ class Rock:
             if self.size in ['Large', 'Medium']:
                 for i in range(2):                          # range(2), because 2 child rocks will be created.
                     if self.size == 'Large':
-                        new_rock = Rock(game.config, 'Medium')
+                        new_rock = game.config.rock_pool.acquire(game.config, 'Medium')
                     else:
-                        new_rock = Rock(game.config, 'Small')
+                        new_rock = game.config.rock_pool.acquire(game.config, 'Small')
 
                     # Give it position that is near it's parent.
-                    new_rock.coords = cc.translation(self.coords, [random.randint(-25, 25), random.randint(-25, 25)])
+                    new_rock.coords = cc.translation(self.coords, [game.config.random.randint(-25, 25),
+                                                                   game.config.random.randint(-25, 25)])
 
                     # New rocks's drift will be similar to parent.
                     # TODO I think this is cause of some child rocks being stationary...
                     # TODO Need to add some check 'if near to zero, then set to 1'
-                    new_drift_x = self.drift[0] + 10 * random.randint(-1, 1) / game.config.target_fps
-                    new_drist_y = self.drift[1] + 10 * random.randint(-1, 1) / game.config.target_fps
+                    new_drift_x = self.drift[0] + 10 * game.config.random.randint(-1, 1) / game.config.target_fps
+                    new_drist_y = self.drift[1] + 10 * game.config.random.randint(-1, 1) / game.config.target_fps
 
                     new_rock.drift = [new_drift_x, new_drist_y]
 
-                    game.rocks.append(new_rock)             # Add the new rocks to the game.
+                    game.rocks.spawn(new_rock)              # Add the new rocks to the game, at end of tick.
 
-    # Draw this rock on game screen.
+    # Add this rock to the render queue, to be drawn on the game screen.
     def draw(self, config):
         # TODO Make the normal rock display, and exploding rock display be separate methods.
+        queue = config.render_queue
 
-        prev_vertex = self.vertices[-1]                     # This will make it a complete polygon.
-
-        for vertex in self.vertices:
-            if not self.exploding:
-                if config.monochrome:
-                    pygame.draw.line(config.screen, config.WHITE, self.position(prev_vertex), self.position(vertex), 1)
-
-                # TODO Refactor to draw whole polygon in one go, rather than drawing a number of triangles.
-                else:
-                    triangle = []
-                    triangle.append(self.position(prev_vertex))
-                    triangle.append(self.position(vertex))
-                    triangle.append(self.coords)
-                    pygame.draw.polygon(config.screen, self.colour, triangle, 0)
-
+        # If drawing is lagging behind the game logic, draw the rock part of the way back to where it was last tick.
+        if config.lag:
+            offset = cc.scale(self.drift, - config.lag)
+            coords = cc.translation(self.coords, offset)
+        else:
+            coords = self.coords
+
+        if not self.exploding and config.sprites:         # One blit of a pre-drawn sprite.
+            queue.blit(*config.sprite_cache.position(config.screen, self.shape, self.rotation, coords,
+                                                     config.WHITE if config.monochrome else self.colour,
+                                                     not config.monochrome))
+
+        elif not self.exploding:
+            outline = self.outline()[::config.quality['rock_vertex_step']]     # Fewer vertices at low quality.
+            if config.lag:
+                outline = [cc.translation(vertex, offset) for vertex in outline]
+
+            # Whole polygon in one go. Every rock is a fan of triangles around its centre, so filling its outline
+            # covers the same pixels as filling each of the triangles.
+            if config.monochrome:
+                queue.outline(config.WHITE, outline)
             else:
+                queue.fill(self.colour, outline)
+
+        # Exploding, and no particle system to draw it, so draw each particle here.
+        elif config.particles is None:
+            # Scaling and rotating can be done in either order, so the cached rotated vertices can be scaled.
+            for vertex in self.shape.rotated(self.rotation)[::config.quality['rock_vertex_step']]:
                 # Higher FPS mean more explosion steps, so lower speed of explosion per step.
                 scaled_vertex = cc.scale(vertex, 5 * self.explosion_step / config.target_fps)
-                [x, y] = self.position(scaled_vertex)
+                [x, y] = cc.translation(scaled_vertex, coords)
 
                 # TODO Use the function in cartesian coordinate package to make coords integers.
                 if config.monochrome:
-                    pygame.draw.circle(config.screen, config.WHITE, [int(x), int(y)], 1, 1)
+                    queue.dot(config.screen, config.WHITE, [int(x), int(y)], 1, 1)
                 else:
-                    pygame.draw.circle(config.screen, self.colour, [int(x), int(y)], 4, 4)
+                    queue.dot(config.screen, self.colour, [int(x), int(y)], 4, 4)
 
                 # TODO Make the ship explosion particle randomly twinkle away.
                 # if random.randint(1, 25) == 10:
                 #     self.explosion_vertices.remove(v)
 
-            prev_vertex = vertex
-
-    # Move the rock by one tick.
-    def move(self):
-        self.rotation += self.rotation_speed
-        self.coords = cc.translation(self.coords, self.drift)
+    # Move the rock by parm number of ticks.
+    def move(self, ticks=1):
+        self.rotation += ticks * self.rotation_speed
+        cc.translate_in_place(self.coords, self.drift if ticks == 1 else cc.scale(self.drift, ticks))
+        self.world_vertices = None                          # Any batch calculated vertices are now out of date.
 
 
 ############################################
@@ -230,33 +324,44 @@ class Rock:
 ############################################
 
 class Bullet:
+
+    __slots__ = ['coords', 'angle', 'colour', 'drift', 'kill']
+
+    # Bullet drift at each angle that bullets have been fired at. Shared by all bullets.
+    drift_cache = cc.RotationCache([[0, 7]])
+
     def __init__(self, origin, angle, colour):
+        self.reset(origin, angle, colour)
 
+    # Make this into a newly fired bullet.
+    def reset(self, origin, angle, colour):
         self.coords = origin                                        # Current [x, y] coordinates of the bullet.
         self.angle = angle                                          # Angle that the bullet is moving in.
         self.colour = colour                                        # Colour of bullet. Will be same as player's ship.
 
         # self.drift = cc.rotate_around_origin([0, 20], self.angle)   # Incremental drift this bullet will do each tick.
-        self.drift = cc.rotate_around_origin([0, 7], self.angle)   # Incremental drift this bullet will do each tick.
+        self.drift = Bullet.drift_cache.rotated(self.angle)[0]   # Incremental drift this bullet will do each tick.
         self.kill = False                                           # Flags is this bullet is to be deleted.
 
-    # Draw the bullet as a little circle on the game screen.
+    # Add the bullet to the render queue, as a little circle on the game screen.
     def draw(self, config):
+        coords = self.coords
+        if config.lag:                  # Drawing is lagging behind the game logic, so draw it part way back.
+            coords = cc.translation(coords, cc.scale(self.drift, - config.lag))
+
         if config.monochrome:
-            pygame.draw.circle(config.screen, config.WHITE, cc.integer_coord(self.coords), 1, 1)
+            config.render_queue.dot(config.screen, config.WHITE, cc.integer_coord(coords), 1, 1)
         else:
-            pygame.draw.circle(config.screen, self.colour, cc.integer_coord(self.coords), 2, 2)
+            config.render_queue.dot(config.screen, self.colour, cc.integer_coord(coords), 2, 2)
 
     # Move the bullet by one tick.
     def move(self):
-        self.coords = cc.translation(self.coords, self.drift)
+        cc.translate_in_place(self.coords, self.drift)
 
-    # Is the bullet still onscreen? If not, flag it to be killed.
+    # Is the bullet still onscreen? If not, flag it to be killed. In a world bigger than the screen, bullets are killed
+    # once they are off the screen, so that they don't fly on across the world.
     def check_onscreen(self, config):
-        if (self.coords[0] < config.left_dead
-                or self.coords[0] > config.right_dead
-                or self.coords[1] < config.top_dead
-                or self.coords[1] > config.bottom_dead):
+        if config.is_far(self.coords, config.border):
             self.kill = True
 
 
@@ -266,7 +371,14 @@ class Bullet:
 
 class SpaceShip:
 
-    def __init__(self, origin, colour):
+    __slots__ = ['coords', 'colour', 'rotation', 'exploding', 'explosion_step', 'kill', 'remaining_invincibility_ticks',
+                 'explosion_vertices', 'bullets']
+
+    # The vertex is the nose of the ship, where bullets are fired from. All ships are the same shape.
+    vertices = [[0, 10], [-5, -5], [0, 0], [5, -5]]
+    shape = cc.RotationCache(vertices)                              # Cache of the ship's vertices at each rotation.
+
+    def __init__(self, config, origin, colour):
 
         self.coords = origin                                        # Starting location of ship is parm origin.
         self.colour = colour                                        # Colour of the ship.
@@ -277,21 +389,18 @@ class SpaceShip:
         self.kill = False                                           # Is the ship flagged to be deleted?
         self.remaining_invincibility_ticks = 0
 
-        # The vertex is the nose of the ship, where bullets are fired from.
-        self.vertices = [[0, 10], [-5, -5], [0, 0], [5, -5]]
-
         # explosion_vertex_count = 72                                    # Number of vertices that will make up explosion.
-        explosion_vertex_count = 20                                    # Number of vertices that will make up explosion.
+        explosion_vertex_count = config.quality['explosion_vertices']  # Number of vertices that will make up explosion.
         slice_size = 360 / explosion_vertex_count                     # Good for this to be an integer.
         self.explosion_vertices = []
 
         for v_num in range(explosion_vertex_count):
-            vertex = [0, 7.0 + random.randint(-2, 2)]
+            vertex = [0, 7.0 + config.random.randint(-2, 2)]
 
-            vertex = cc.rotate_around_origin(vertex, slice_size * v_num)
+            vertex = cc.rotate_by_table(vertex, slice_size * v_num)
             self.explosion_vertices.append(vertex)
 
-        self.bullets = []                       # Bullets in flight will be appended to this list when they are fired.
+        self.bullets = entity_store.EntityStore()   # Bullets in flight are added to this when they are fired.
 
     # Rotate the ship clockwise by 10 degrees.
     def rotate_clockwise(self):
@@ -308,66 +417,76 @@ class SpaceShip:
     # If ship is not currently exploding, then fire a bullet from its nose.
     def fire_bullet(self, config):
         # if len(self.bullets) < 10 and not self.exploding:
-        # To help frame rate, reduce max number of bullets.
-        if len(self.bullets) < 5 and not self.exploding:
+        # To help frame rate, reduce max number of bullets. How many depends on the quality level.
+        if self.bullets.len_after_flush() < 5 and not self.exploding:
 
             # Bullets should originate from the ships nose.
             # Vertex 0 of the ship is it's nose.
-            ship_nose = self.position(self.vertices[0])
-            self.bullets.append(Bullet(ship_nose, self.rotation, self.colour))
+            ship_nose = self.outline()[0]
+            self.bullets.spawn(config.bullet_pool.acquire(ship_nose, self.rotation, self.colour))
 
             config.laser_channel.play(config.laser_sound)
 
     # Calculate position of parm ship vertex in game screen coordinates.
     def position(self, vertex):
-        rotated = cc.rotate_around_origin(vertex, self.rotation)
+        rotated = cc.rotate_by_table(vertex, self.rotation)
         return cc.translation(rotated, self.coords)
 
+    # Coordinates of all of the ship's vertices on the game screen.
+    def outline(self):
+        return [cc.translation(vertex, self.coords) for vertex in self.shape.rotated(self.rotation)]
+
+    # Add the ship to the render queue, to be drawn on the game screen.
     def draw(self, config):
         # TODO Refactor to have separate methods for drawing ship and drawing exploding ship.
+        queue = config.render_queue
 
-        prev_vertex = self.vertices[-1]  # This will make it a complete polygon.
-
-        if not self.exploding:
-            for vertex in self.vertices:
-                if config.monochrome:
-                    pygame.draw.line(config.screen, config.WHITE, self.position(prev_vertex), self.position(vertex), 1)
-
-                # TODO refactor to draw whole polygon in one go, rather than drawing a number of triangles.
-                else:
-                    triangle = []
-                    triangle.append(self.position(prev_vertex))
-                    triangle.append(self.position(vertex))
-                    triangle.append(self.coords)
-                    pygame.draw.polygon(config.screen, self.colour, triangle, 0)
+        if not self.exploding and config.sprites:         # One blit of a pre-drawn sprite.
+            queue.blit(*config.sprite_cache.position(config.screen, self.shape, self.rotation, self.coords,
+                                                     config.WHITE if config.monochrome else self.colour,
+                                                     not config.monochrome))
 
-                prev_vertex = vertex
+        elif not self.exploding:
+            if config.monochrome:
+                queue.outline(config.WHITE, self.outline())
+            else:
+                queue.fill(self.colour, self.outline())
 
-        else:
+        # Exploding, and no particle system to draw it, so draw each particle here.
+        elif config.particles is None:
             for v in self.explosion_vertices:
                 scaled_vertex = cc.scale(v, 5 * self.explosion_step / config.target_fps)
                 [x, y] = cc.translation(scaled_vertex, self.coords)
 
                 if config.monochrome:
-                    pygame.draw.circle(config.screen, config.WHITE, [int(x), int(y)], 1, 1)
+                    queue.dot(config.screen, config.WHITE, [int(x), int(y)], 1, 1)
                 else:
-                    pygame.draw.circle(config.screen, self.colour, [int(x), int(y)], 4, 4)
-
-                # Make the ship explosion particle randomly twinkle away.
-                if random.randint(1, 100) == 50:
-                    self.explosion_vertices.remove(v)
+                    queue.dot(config.screen, self.colour, [int(x), int(y)], 4, 4)
 
     # Begin the explosion of the ship.
     def explode(self, config):
         self.exploding = True  # Start exploding the ship.
         config.ship_explosion_channel.play(config.ship_explosion_sound)
 
+        # Each particle has a 1 in 100 chance of twinkling away each tick, so work out now how long each one lasts.
+        if config.particles is not None:
+            duration = 4 * config.target_fps + 1
+            velocities = [cc.scale(v, 5 / config.target_fps) for v in self.explosion_vertices]
+            lives = [min(duration, 1 + int(math.log(1 - config.random.random()) / math.log(0.99)))
+                     for v in self.explosion_vertices]
+            config.particles.emit(self.coords, velocities, lives, self.colour)
+
     def animate_explosion(self, config):
         if self.explosion_step < 4 * config.target_fps:    # Higher FPS mean, more animation steps for explosion!
             self.explosion_step += 1
         else:
             self.kill = True                        # Explosion animation is over, so kill off the rock.
 
+        # Make the ship explosion particles randomly twinkle away. Done here, rather than while drawing, so that it
+        # doesn't matter whether frames are drawn or not.
+        if config.particles is None:
+            self.explosion_vertices = [v for v in self.explosion_vertices if config.random.randint(1, 100) != 50]
+
 
 ############################################
 # PLAYER
@@ -375,14 +494,16 @@ class SpaceShip:
 
 class Player:
 
-    def __init__(self, player_name, colour, origin):
+    __slots__ = ['player_name', 'colour', 'origin', 'score', 'ship']
+
+    def __init__(self, config, player_name, colour, origin):
 
         self.player_name = player_name          # For example, 'Player 1'.
         self.colour = colour                    # Colour of player's ship, bullets and score [r, g, b].
         self.origin = origin                    # Starting coordinates for player's ship [x, y].
 
         self.score = 0                          # Number of points that he's scored.
-        self.ship = SpaceShip(origin, colour)   # This player's spaceship.
+        self.ship = SpaceShip(config, origin, colour)   # This player's spaceship.
 
     def killed_a_rock(self, size):
         if size == 'Large':
@@ -392,10 +513,13 @@ class Player:
         else:                                   # Small rocks are hard to hit, hence they score 30 points.
             self.score += 30
 
-    def lost_a_spaceship(self):
+    def lost_a_spaceship(self, config):
+        for b in self.ship.bullets.clear():     # Bullets of the lost ship can be reused.
+            config.bullet_pool.release(b)
+
         origin = self.ship.coords
         colour = self.ship.colour
-        self.ship = SpaceShip(origin, colour)   # Replace the killed spaceship with a new one.
+        self.ship = SpaceShip(config, origin, colour)   # Replace the killed spaceship with a new one.
         self.score -= 100
 
 
@@ -409,15 +533,28 @@ class Game:
 
         self.config = config
 
+        # True=the world is bigger than the screen, so the screen is a viewport onto the part of it around the ship.
+        self.scrolling = self.config.world_size != self.config.screen_size
+
         # Create some rocks for start of game.
         # self.num_rocks = 20                             # Target number of rocks to have on screen at once.
-        self.num_rocks = 15                             # Target number of rocks to have on screen at once.
+        self.num_rocks = self.target_rocks()                # Target number of rocks to have in the world at once.
+
+        # If turned on, the rocks are moved in batches using NumPy arrays, rather than one at a time.
+        if self.config.vectorised and numpy_arrays.available():
+            self.rock_arrays = rock_arrays.RockArrays(4 * self.num_rocks, 12)
+        else:
+            self.rock_arrays = None
 
-        self.rocks = []
+        self.rocks = entity_store.EntityStore()
         for r in range(int(self.num_rocks / 2)):
-            new_rock = Rock(self.config, 'Large')
-            new_rock.place_on_side_of_screen(self.config)
-            self.rocks.append(new_rock)
+            new_rock = self.config.rock_pool.acquire(self.config, 'Large')
+            if self.scrolling:
+                new_rock.place_in_world(self.config)        # From the edges, it would take ages to reach the ship.
+            else:
+                new_rock.place_on_side_of_screen(self.config)
+            self.rocks.spawn(new_rock)
+        self.rocks.flush()
 
         assert self.config.num_players in [1, 2]
         self.players = []                               # List of players.
@@ -430,53 +567,80 @@ class Game:
                 colour = self.config.GREEN                     # Second player has a green ship.
 
             if self.config.num_players == 1:                   # If only one player, she can be in centre of screen.
-                origin = self.config.screen_centre
+                origin = self.config.world_centre
             else:
-                origin_y = self.config.screen_centre[1]
+                origin_y = self.config.world_centre[1]
                 screen_width = self.config.screen_size[0]
 
                 if n == 0:
                     # For 2 player game, first player is moved a bit to the left.
-                    origin_x = self.config.screen_centre[0] - int(screen_width / 4)
+                    origin_x = self.config.world_centre[0] - int(screen_width / 4)
                 else:
                     # For 2 player game, second player is moved a bit to the right.
-                    origin_x = self.config.screen_centre[0] + int(screen_width / 4)
+                    origin_x = self.config.world_centre[0] + int(screen_width / 4)
 
                 origin = [origin_x, origin_y]
 
-            self.players.append(Player(player_name, colour, origin))    # Add each player to the list of players.
+            self.players.append(Player(self.config, player_name, colour, origin))    # Add each player to the list of players.
+
+        # Parts of the screen drawn on in the previous frame, for dirty rectangle mode.
+        self.dirty_rects = renderer.DirtyRects(self.config.screen_size, 0.5)
 
-        self.game_end_time = time.time() + 60                   # '60' is the length of the game in seconds.
+        # Grid of cells used to speed up the collision checks, and to find the rocks on screen when scrolling. Cells are
+        # a bit bigger than a Large rock's radius.
+        self.spatial_hash = spatial_hash.SpatialHash(self.config, 40)
+        self.tick_count = 0                 # Ticks of game logic done so far.
+        self.follow_ship()
 
+        self.game_end_time = self.config.now() + 60                   # '60' is the length of the game in seconds.
+
+        self.time_owed = 0                  # Milliseconds of real time that game logic ticks have not yet been run for.
+        self.ticks_since_drawn = 0          # Game logic ticks done since a frame was last drawn.
+        self.frames_skipped = 0             # Number of frames in a row that haven't been drawn, to catch up.
+        self.ticks_per_frame = {}           # Key is number of ticks done for a drawn frame, value is count of frames.
+
+        self.frames_drawn = 0
+        self.recorder = None                # If the game is being recorded, keys pressed each tick are sent to this.
+        self.hud = None                     # Latest texts of the score, time left and FPS.
+
+    # Draw parm text on the screen. Returns the rectangle of the screen that was drawn on.
     def draw_text(self, text, x, y, colour):
-        textsurface = self.config.myfont.render(text, False, colour)
-        self.config.screen.blit(textsurface, (x, y))
+        textsurface = self.config.text_cache.render(text, colour)
+        return self.config.screen.blit(textsurface, (x, y))
 
     def draw_centred_white_text(self, text, position, y):
         assert position in ['Centre', 'Left', 'Right']
 
         pixels_per_char = 12                    # Width of 1 char of text of screen in Courier font.
         if position == "Centre":
-            self.draw_text(text,
-                           int(self.config.screen_centre[0] - pixels_per_char * len(text) / 2),
-                           y,
-                           self.config.WHITE)
+            return self.draw_text(text,
+                                  int(self.config.screen_centre[0] - pixels_per_char * len(text) / 2),
+                                  y,
+                                  self.config.WHITE)
         elif position == "Left":
-            self.draw_text(text,
-                           int(self.config.screen_size[0] * 0.25 - pixels_per_char * len(text) / 2),
-                           y,
-                           self.config.WHITE)
+            return self.draw_text(text,
+                                  int(self.config.screen_size[0] * 0.25 - pixels_per_char * len(text) / 2),
+                                  y,
+                                  self.config.WHITE)
         else:
-            self.draw_text(text,
-                           int(self.config.screen_size[0] * 0.75 - pixels_per_char * len(text) / 2),
-                           y,
-                           self.config.WHITE)
+            return self.draw_text(text,
+                                  int(self.config.screen_size[0] * 0.75 - pixels_per_char * len(text) / 2),
+                                  y,
+                                  self.config.WHITE)
+
+    # Texts of the score, time left and FPS. At low quality levels they are only worked out every few frames.
+    def hud_texts(self):
+        if self.hud is None or self.frames_drawn % self.config.quality['hud_refresh'] == 0:
+            self.hud = {'score': 'Score: ' + str(self.players[0].score),
+                        'time': 'Time: ' + str(round(self.game_end_time - self.config.now())),
+                        'fps': 'FPS = ' + str(round(self.config.clock.get_fps()))}
+        return self.hud
 
     # Draw the frames per second at the bottom left of the screen.
     def draw_fps(self):
-        self.draw_text('FPS = ' + str(round(self.config.clock.get_fps())),
-                       210, self.config.screen_size[1] - 30, self.config.WHITE)
+        return self.draw_text(self.hud_texts()['fps'], 210, self.config.screen_size[1] - 30, self.config.WHITE)
 
+    # Draw the score, and time left. Returns a list of the rectangles of the screen that were drawn on.
     def draw_game_info(self):
         # Always draw first player's score, as there is always at least 1 player.
         if self.config.monochrome:
@@ -488,7 +652,7 @@ class Game:
                 c2 = self.players[1].colour
 
         # self.draw_text(self.players[0].player_name + ': ' + str(self.players[0].score), 10, 10, self.config.WHITE)
-        self.draw_text('Score: ' + str(self.players[0].score), 10, 10, self.config.WHITE)
+        drawn = [self.draw_text(self.hud_texts()['score'], 10, 10, self.config.WHITE)]
 
 
         # if self.config.num_players == 2:
@@ -498,14 +662,16 @@ class Game:
         #                           c2)
 
         if not self.config.demo_mode:
-            self.draw_text('Time: ' + str(round(self.game_end_time - time.time())),
-                           10,
-                           self.config.screen_size[1] - 30,
-                           self.config.WHITE)
+            drawn.append(self.draw_text(self.hud_texts()['time'],
+                                        10,
+                                        self.config.screen_size[1] - 30,
+                                        self.config.WHITE))
+
+        return drawn
 
     # Draw instruction on screen during demo mode.
     def draw_demo_info(self):
-        self.draw_centred_white_text('GAME OVER', 'Centre', self.config.screen_centre[1] - 60)
+        return self.draw_centred_white_text('GAME OVER', 'Centre', self.config.screen_centre[1] - 60)
         # self.draw_centred_white_text('Press 1 for 1 player game', 'Centre', self.config.screen_centre[1] - 100)
         # self.draw_centred_white_text('Press 2 for 2 player game', 'Centre', self.config.screen_centre[1] - 75)
 
@@ -521,29 +687,95 @@ class Game:
 
     # This one method does the drawing of all of the graphical elements in the game.
     def draw_all_elements(self):
-        # Clear the screen and set the screen background.
-        self.config.screen.fill(self.config.BLACK)
+        self.config.profiler.start('draw')
+        self.frames_drawn += 1
+
+        # Clear the screen and set the screen background. In dirty rectangle mode, only the parts of the screen that
+        # were drawn on last frame need clearing.
+        if self.config.dirty_rects:
+            self.dirty_rects.erase(self.config.screen, self.config.BLACK)
+        else:
+            self.config.screen.fill(self.config.BLACK)
 
-        for r in self.rocks:                    # Draw each rock.
+        drawn = []                              # Rectangles of the screen drawn on this frame.
+
+        # When scrolling, only the rocks that are on screen are queued up, so the cost of drawing doesn't depend on the
+        # size of the world.
+        if self.scrolling:
+            self.follow_ship()
+            rocks = self.visible_rocks()
+        else:
+            rocks = self.rocks
+        self.config.render_queue.camera = self.config.camera
+
+        for r in rocks:                         # Queue up each rock.
             r.draw(self.config)
 
-        # Loop through all of the players, drawing their ships, and their ship's bullets.
+        # Loop through all of the players, queueing up their ships, and their ship's bullets.
         for p in self.players:
-            p.ship.draw(self.config)                       # Draw the player's space ship.
+            p.ship.draw(self.config)            # The player's space ship.
 
-            for b in p.ship.bullets:                  # Draw each bullet.
+            for b in p.ship.bullets:            # Each bullet.
                 b.draw(self.config)
 
-        self.draw_game_info()
+        if self.config.particles is not None:
+            self.config.particles.draw(self.config)     # All of the explosion particles.
+
+        # Everything queued up is drawn in as few calls as possible.
+        drawn.extend(self.config.render_queue.submit(self.config.screen))
+
+        drawn.extend(self.draw_game_info())
 
         if self.config.demo_mode:
-            self.draw_demo_info()
+            drawn.append(self.draw_demo_info())
 
         # If in debug mode, draw the frames per second onscreen.
 #        if self.config.debug:
-        self.draw_fps()
+        drawn.append(self.draw_fps())
+
+        if self.config.profile:
+            drawn.extend(self.config.profiler.draw_overlay(self.config, 210, self.config.screen_size[1] - 30))
 
-        pygame.display.flip()
+        self.config.profiler.start('flip')
+        if self.config.framebuffer is not None:
+            self.config.framebuffer.update(self.config.screen)     # Only the scanlines that have changed.
+        elif self.config.dirty_rects:
+            self.dirty_rects.update(drawn)      # Only send the changed parts of the screen to the display.
+        else:
+            pygame.display.flip()
+        self.config.profiler.stop()
+
+    # Move the screen's viewport of the world so that the first player's ship is in the centre of it, unless that would
+    # go past the edge of the world.
+    def follow_ship(self):
+        [x, y] = self.players[0].ship.coords
+        self.config.camera = [min(max(int(x) - self.config.screen_centre[0], 0),
+                                  self.config.world_size[0] - self.config.screen_size[0]),
+                              min(max(int(y) - self.config.screen_centre[1], 0),
+                                  self.config.world_size[1] - self.config.screen_size[1])]
+
+    # Rocks that are at least partly on the screen, found using the spatial hash.
+    def visible_rocks(self):
+        self.spatial_hash.clear()               # The next tick rebuilds it for the collisions anyway.
+        for r in self.rocks:
+            if not r.far:
+                self.spatial_hash.insert(r, r.coords, r.bounding_radius)
+
+        [left, top] = self.config.camera
+        return self.spatial_hash.query_rect([left, top],
+                                            [left + self.config.screen_size[0], top + self.config.screen_size[1]])
+
+    # Give all of this game's rocks and bullets back to the pools, when the game is finished with.
+    def release_to_pools(self):
+        for r in self.rocks.clear():
+            self.config.rock_pool.release(r)
+
+        for p in self.players:
+            for b in p.ship.bullets.clear():
+                self.config.bullet_pool.release(b)
+
+        if self.config.particles is not None:
+            self.config.particles.clear()
 
     # Take a screenshot. Save it in the 'screenshots' folder.
     def take_screenshot(self):
@@ -551,9 +783,12 @@ class Game:
         pygame.image.save(self.config.screen, screenshot_name)
         self.config.screenshot_num += 1
 
-    # Act on key presses bu game players.
-    def key_handling(self):
-        keys = pygame.key.get_pressed()
+    # Act on key presses bu game players. If parm keys is given, it is used instead of the keys currently pressed.
+    def key_handling(self, keys=None):
+        if keys is None:
+            keys = self.config.input.keys()
+        if self.recorder is not None:
+            self.recorder.record(keys, self.config.governor.level)
 
         if keys[pygame.K_z]:
             self.players[0].ship.rotate_anticlockwise()
@@ -578,79 +813,243 @@ class Game:
         else:
             return False
 
+    # Check whether any rocks have been hit by bullets, or have hit a ship.
+    def check_collisions(self):
+        # Rebuild the grid, so that each bullet and ship only needs checking against rocks in the same cell as it.
+        self.spatial_hash.clear()
+        for r in self.rocks:
+            if not r.exploding and not r.far:       # Rocks far off the screen can't be hit by bullets or ships.
+                self.spatial_hash.insert(r, r.coords, r.bounding_radius)
+
+        for p in self.players:
+            # Group the bullets by the rocks they might have hit, so each rock checks all of its bullets in one go.
+            candidates = {}
+            for b in p.ship.bullets:
+                for r in self.spatial_hash.query(b.coords):
+                    if not r.exploding:
+                        candidates.setdefault(r, []).append(b)
+
+            for r, bullets in candidates.items():
+                for b, hit in zip(bullets, r.check_collisions([b.coords for b in bullets])):
+                    if hit and not b.kill:                  # Bullet might have already hit another rock this tick.
+                        self.spatial_hash.hits += 1
+                        r.explode(self.config)
+                        b.kill = True  # This bullet has killed a rock, so it must be killed itself too.
+                        p.killed_a_rock(r.size)
+                        break
+
+            if not p.ship.exploding:
+                for r in self.spatial_hash.query(p.ship.coords):
+                    if not r.exploding:
+                        r.check_collision(p.ship.coords)
+                        if r.collision:  # The rock hit the ship.
+                            self.spatial_hash.hits += 1
+                            r.explode(self.config)  # Start exploding the rock.
+                            p.ship.explode(self.config)
+                            break
+
     # Do one tick of the game logic and drawing to screen, etc.
-    # If in demo mode, collision detection will be skipped.
     def animate_1_tick(self):
         # Ensure that the game ticks do not exceed the target FPS.
         self.config.clock.tick(self.config.target_fps)
 
-        for p in self.players:
-            # If player ship exploding, do the next step of the explosion animation.
-            if p.ship.exploding:
-                p.ship.animate_explosion(self.config)
+        self.simulate_1_tick()
 
-            if p.ship.kill:
-                p.lost_a_spaceship()
+        if self.config.render:
+            self.draw_all_elements()
 
-            for b in p.ship.bullets:
+    # Do however many ticks of game logic are due, then draw one frame. With a fixed timestep, the game logic does
+    # target_fps ticks per second of real time, so the game runs at the same speed even when frames take too long to
+    # draw. When ticks have had to be caught up, drawing is skipped for a few frames so that the game can get back on
+    # time. Parm key_handler is called before each tick. Returns True if it ever returned True.
+    def animate_frame(self, key_handler=None):
+        tick_length = 1000 / self.config.target_fps
+
+        # Ensure that the frames do not exceed the target FPS. Returns milliseconds since the previous frame.
+        elapsed = self.config.clock.tick(self.config.target_fps)
+
+        # Raw time is the time that the last frame took, not counting any waiting to keep to the target FPS.
+        if self.config.adaptive_quality and self.config.governor.record(self.config.clock.get_rawtime(), elapsed):
+            self.change_quality()
+
+        if self.config.fixed_timestep:
+            # Capped, so that after a long stall the game doesn't freeze up trying to catch up all of the ticks.
+            self.time_owed = min(self.time_owed + elapsed, self.config.max_ticks_per_frame * tick_length)
+        else:
+            self.time_owed = tick_length                    # Exactly one tick per frame.
+
+        ticks = 0
+        escape_pressed = False
+        while self.time_owed >= tick_length:
+            if key_handler is not None:
+                self.config.profiler.start('input')
+                escape_pressed = key_handler() or escape_pressed
+                self.config.profiler.stop()
+
+            self.simulate_1_tick()
+            self.time_owed -= tick_length
+            ticks += 1
+        self.ticks_since_drawn += ticks
+
+        # More than one tick needed means the last frame took too long. Not drawing this one helps to catch up.
+        if ticks > 1 and self.frames_skipped < self.config.max_frame_skip:
+            self.frames_skipped += 1
+
+        elif self.config.render:
+            if self.config.interpolate:
+                self.config.lag = 1 - self.time_owed / tick_length
+            self.draw_all_elements()
+            self.config.lag = 0
+            self.config.input.frame_drawn()
+
+            self.ticks_per_frame[self.ticks_since_drawn] = self.ticks_per_frame.get(self.ticks_since_drawn, 0) + 1
+            self.ticks_since_drawn = 0
+            self.frames_skipped = 0
+
+        return escape_pressed
+
+    # Start using the quality level that the governor has just moved to.
+    def change_quality(self):
+        self.config.quality = self.config.governor.settings()
+        self.num_rocks = self.target_rocks()
+        if self.config.tracer is not None:
+            self.config.tracer.record(tracer.QUALITY_CHANGED, self.config.governor.level)
+
+    # Target number of rocks for the current quality level. A world bigger than the screen has the same number of rocks
+    # per screenful.
+    def target_rocks(self):
+        [world_width, world_height] = self.config.world_size
+        [screen_width, screen_height] = self.config.screen_size
+        return int(self.config.quality['num_rocks'] * world_width * world_height / (screen_width * screen_height))
+
+    # Summary of how many game logic ticks were done for each frame that was drawn.
+    def frame_report(self):
+        return 'Ticks per drawn frame: ' + ', '.join(str(ticks) + ' x ' + str(self.ticks_per_frame[ticks])
+                                                     for ticks in sorted(self.ticks_per_frame))
+
+    # Do one tick of the game logic, without drawing anything.
+    # If in demo mode, collision detection will be skipped.
+    def simulate_1_tick(self):
+        # Each phase of the tick is timed separately, so it is possible to see which one is using up the time.
+        profiler = self.config.profiler
+
+        # Bring in any bullets that were fired since the last tick, so they move this tick, same as all the others.
+        self.flush_entities()
+        self.tick_count += 1
+
+        profiler.start('bullet move')
+        self.move_bullets()
+
+        profiler.start('rock move')
+        self.move_rocks()
+
+        # In demo mode, don't check for collisions.
+        if not self.config.demo_mode:
+            profiler.start('collision')
+            self.check_collisions()
+
+        profiler.start('explosion')
+        self.animate_explosions()
+
+        profiler.start('rock respawn')
+        self.respawn_rocks()
+
+        # Rocks and bullets added or removed during this tick only actually come and go now, at the end of the tick.
+        self.flush_entities()
+        profiler.stop()
+
+    # Move each player's bullets, queueing the removal of any that have gone off screen or hit a rock.
+    def move_bullets(self):
+        for p in self.players:
+            bullets = p.ship.bullets
+            for position, b in enumerate(bullets):
                 b.move()
                 b.check_onscreen(self.config)
                 if b.kill:
-                    p.ship.bullets.remove(b)
-                    trace(self.config, 'Bullet removed, bullets left for ' +
-                          p.player_name + ' =' + str(len(p.ship.bullets)))
+                    bullets.despawn(bullets.handle_at(position))
+
+    # Move the rocks, flagging any that have gone off screen to be killed.
+    def move_rocks(self):
+        if self.rock_arrays is not None:
+            self.rock_arrays.move_rocks(self.rocks, self.config, self.scrolling)    # Move all rocks in one batch.
+
+        elif self.scrolling:
+            # Rocks far outside of the screen are only moved every far_update_interval ticks, by that many ticks' worth.
+            # Which tick that is depends on the rock's position in the list, so they don't all move on the same tick.
+            interval = self.config.far_update_interval
+            for position, r in enumerate(self.rocks):
+                if r.far and (position + self.tick_count) % interval != 0:
+                    r.idle_ticks += 1
+                    continue
+                r.move(r.idle_ticks + 1)
+                r.idle_ticks = 0
+                r.far = self.config.is_far(r.coords, self.config.far_distance)
+                r.check_onscreen(self.config)
 
-        for r in self.rocks:
-            r.move()
-            r.check_onscreen(self.config)
-
-            # Check whether this rock has been hit by a bullet.
-            if not r.exploding:
-                for p in self.players:
-
-                    # In demo mode, don't check for collisions.
-                    if not self.config.demo_mode:
-                        for b in p.ship.bullets:
-                            r.check_collision(b.coords)
-                            if r.collision:
-                                r.explode(self.config)
-                                b.kill = True  # This bullet has killed a rock, so it must be killed itself too.
-                                p.killed_a_rock(r.size)
-
-            # In demo mode, don't check for collisions.
-            if not r.exploding and not self.config.demo_mode:
-                for p in self.players:
-                    if not p.ship.exploding:
+        else:
+            for r in self.rocks:
+                r.move()
+                r.check_onscreen(self.config)
 
-                        r.check_collision(p.ship.coords)
-                        if r.collision:  # The rock hit the ship.
-                            r.explode(self.config)  # Start exploding the rock.
-                            p.ship.explode(self.config)
+    # Do the next step of the explosion animation for each exploding ship and rock.
+    def animate_explosions(self):
+        for p in self.players:
+            # If player ship exploding, do the next step of the explosion animation.
+            if p.ship.exploding:
+                p.ship.animate_explosion(self.config)
+
+            if p.ship.kill:
+                p.lost_a_spaceship(self.config)
 
+        for r in self.rocks:
             # If this rock is exploding, do the steps of the explosion animation - including possibly, creating
             # child rocks.
             if r.exploding:
                 r.animate_explosion(self)
 
+        if self.config.particles is not None:
+            self.config.particles.update()          # Move all of the explosion particles in one batch.
+
+    # Queue the removal of rocks that have been killed, replacing them with new ones.
+    def respawn_rocks(self):
+        for position, r in enumerate(self.rocks):
             if r.kill:
                 if r.exploding:  # Must have collided with something.
                     # If we are getting low on rocks, then create a new large rock.
-                    if len(self.rocks) <= self.num_rocks:
-                        new_rock = Rock(self.config, 'Large')
-                        new_rock.place_on_side_of_screen(self.config)
-                        self.rocks.append(new_rock)
-
-                else:  # Must be getting killed due to being at edge of screen.
-                    # Make new rock. Same size as one that is about to be removed.
-                    new_rock = Rock(self.config, r.size)
-                    new_rock.place_on_side_of_screen(self.config)
-                    self.rocks.append(new_rock)
-
-                self.rocks.remove(r)  # Rock is to be killed, so remove it from the list of rocks.
-
-                trace(self.config, r.size + ' rock removed, rocks left=' + str(len(self.rocks)))
-
-        self.draw_all_elements()
+                    if self.rocks.len_after_flush() <= self.num_rocks:
+                        new_rock = self.config.rock_pool.acquire(self.config, 'Large')
+                        self.place_new_rock(new_rock)
+                        self.rocks.spawn(new_rock)
+
+                # Must be getting killed due to being at edge of screen. Unless there are already more rocks than the
+                # target (which can drop when quality is lowered), make a new rock the same size as the one removed.
+                elif self.rocks.len_after_flush() <= self.num_rocks:
+                    new_rock = self.config.rock_pool.acquire(self.config, r.size)
+                    self.place_new_rock(new_rock)
+                    self.rocks.spawn(new_rock)
+
+                self.rocks.despawn(self.rocks.handle_at(position))  # Rock is killed, so remove it at end of tick.
+
+    # Put parm new rock at the edge of the screen, or of the world when scrolling, drifting inwards.
+    def place_new_rock(self, rock):
+        if self.scrolling:
+            rock.place_on_edge_of_world(self.config)
+        else:
+            rock.place_on_side_of_screen(self.config)
+
+    # Do the queued adds and removes of rocks and bullets. Removed ones are given back to the pools.
+    def flush_entities(self):
+        event_tracer = self.config.tracer
+        for r in self.rocks.flush():
+            self.config.rock_pool.release(r)
+            if event_tracer is not None:
+                event_tracer.record(tracer.ROCK_REMOVED, tracer.SIZES.index(r.size), len(self.rocks))
+
+        for n, p in enumerate(self.players):
+            for b in p.ship.bullets.flush():
+                self.config.bullet_pool.release(b)
+                if event_tracer is not None:
+                    event_tracer.record(tracer.BULLET_REMOVED, n + 1, len(p.ship.bullets))
 
     # Actually play the game.
     def play(self):
@@ -660,20 +1059,122 @@ class Game:
 
         # Loop until the user clicks the close button, or game time is up.
         while not done:
-            for event in pygame.event.get():    # User did something
-                if event.type == pygame.QUIT:   # If user clicked close
-                    self.config.quit = True
-                    done = True                 # Flag that we are done so we exit this loop
+            if self.config.input.quit:          # If user clicked close
+                self.config.quit = True
+                done = True                     # Flag that we are done so we exit this loop
 
             # Out of time?
-            if time.time() >= self.game_end_time:
+            if self.config.now() >= self.game_end_time:
                 done = True
 
-            escape_pressed = self.key_handling()
-            if escape_pressed:
+            # Keys are checked before each tick of game logic, so that the ship turns at the same speed in real time
+            # however many ticks are done per frame.
+            if self.animate_frame(self.key_handling):
                 done = True
 
-            self.animate_1_tick()
+        if self.recorder is not None:
+            self.recorder.close()
+            trace(self.config, 'Recorded ' + str(self.recorder.ticks) + ' ticks.')
+
+        trace(self.config, self.spatial_hash.report())
+        trace(self.config, self.frame_report())
+        trace(self.config, self.config.governor.report())
+        trace(self.config, self.config.input.report())
+        trace(self.config, self.config.render_queue.report())
+
+
+############################################
+# POOLS
+############################################
+
+# Fixed supply of Rock objects, made when the program starts, that are reused rather than creating new ones in the
+# middle of a frame. The pool also has a supply of ready made rock shapes to choose from.
+class RockPool:
+
+    def __init__(self, config, capacity, shapes_per_size):
+        self.shapes = {}                                    # Key is rock size, value is list of RockShapes.
+        for size in ['Small', 'Medium', 'Large']:
+            self.shapes[size] = [RockShape(config, size) for s in range(shapes_per_size)]
+
+        self.free = [Rock(config, 'Large', self.shapes['Large'][0]) for r in range(capacity)]
+        self.allocations = 0                                # Rocks created after start up, as pool was empty.
+
+    # Get a new rock of parm size. Its shape is picked at random from the ready made ones.
+    def acquire(self, config, size):
+        shape = config.random.choice(self.shapes[size])
+
+        if self.free:
+            rock = self.free.pop()
+            rock.reuses += 1
+            rock.reset(config, size, shape)
+        else:
+            rock = Rock(config, size, shape)
+            self.allocations += 1
+
+        if config.tracer is not None:                       # Send trace info to the trace file.
+            config.tracer.record(tracer.ROCK_CREATED, tracer.SIZES.index(size))
+        return rock
+
+    # Give a rock that is no longer in the game back to the pool.
+    def release(self, rock):
+        self.free.append(rock)
+
+
+# Fixed supply of Bullet objects, which are reused.
+class BulletPool:
+
+    def __init__(self, capacity):
+        self.free = [Bullet([0, 0], 0, (0, 0, 0)) for b in range(capacity)]
+        self.allocations = 0                                # Bullets created after start up, as pool was empty.
+
+    def acquire(self, origin, angle, colour):
+        if self.free:
+            bullet = self.free.pop()
+            bullet.reset(origin, angle, colour)
+        else:
+            bullet = Bullet(origin, angle, colour)
+            self.allocations += 1
+        return bullet
+
+    # Give a bullet that is no longer in the game back to the pool.
+    def release(self, bullet):
+        self.free.append(bullet)
+
+
+############################################
+# HEADLESS
+############################################
+
+# Stands in for pygame.time.Clock in headless mode. Time moves on by exactly one frame per tick, and never sleeps, so
+# the game logic can run as fast as the computer allows.
+class FixedClock:
+
+    def __init__(self, target_fps):
+        self.target_fps = target_fps
+        self.ticks = 0                                      # Number of ticks done so far.
+
+    # Returns exact milliseconds per tick, so that a fixed timestep game always does one tick per frame.
+    def tick(self, framerate=0):
+        self.ticks += 1
+        return 1000 / self.target_fps
+
+    # Milliseconds used by the previous tick.
+    def get_time(self):
+        return int(1000 / self.target_fps)
+
+    # Milliseconds of work done in the previous tick. Always exactly on budget, so quality level never changes.
+    def get_rawtime(self):
+        return self.get_time()
+
+    def get_fps(self):
+        return self.target_fps
+
+
+# Stands in for pygame.mixer Sounds and Channels in headless mode, when there is no sound system.
+class SilentSound:
+
+    def play(self, *args):
+        pass
 
 
 ############################################
@@ -682,20 +1183,85 @@ class Game:
 
 class Config:
 
-    def __init__(self, debug, target_fps):
+    def __init__(self, debug, target_fps, headless=False, seed=None, framebuffer_path=None, input_device=None,
+                 world_size=None, sound_preset='balanced', sound_cache_folder='sound_cache',
+                 background_sound_load=True, trace_file='trace.log'):
+        self.startup = profiler.StartupTimer()      # In debug mode, time taken by each stage is reported.
 
         self.debug = debug                  # True=logging sent to stdout, and current FPS displayed on screen.
         self.target_fps = target_fps        # Some game animations use target Frames Per Second to control their pace.
 
+        # In debug mode, events in the middle of a tick are logged to trace_file by a background thread, rather than
+        # printed. The tracer is started straight away, so trace_file is a parm. None=tracing is off.
+        self.trace_file = trace_file
+        self.tracer = tracer.Tracer(trace_file, 4096) if debug and trace_file is not None else None
+
+        # True=no real display, no sound, and a clock that moves on one frame per tick rather than with real time.
+        self.headless = headless
+        self.render = not headless          # True=draw the screen each tick.
+
+        # All randomness in the game comes from here. The same seed always gives the same game.
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.game_seed = None               # Seed that the latest game started from, made by new_game().
+
+        # If set, each game played is recorded to a file in this folder. See replay.py for how to play them back.
+        self.replay_folder = None
+        self.replay_num = 1                 # Number of the next recording.
+
         self.monochrome = True              # True=old style graphics used for rocks, etc.
+
+        # True=timings of each phase of the frame are drawn on screen, and saved to profile_file on exit.
+        self.profile = debug
+        self.profile_file = 'frame_profile.csv'
+        self.profiler = profiler.FrameProfiler(250)     # Statistics are over the last 10 seconds at 25 FPS.
+        self.vectorised = True              # True=rocks moved in batches using NumPy, if it is installed.
+        self.dirty_rects = False            # True=only the parts of the screen that have changed are redrawn.
+
+        # True=game logic does target_fps ticks per second of real time, however long frames take to draw. If a frame
+        # is running late, up to max_frame_skip frames in a row aren't drawn, so that the game can catch up.
+        self.fixed_timestep = True
+        self.max_ticks_per_frame = 5        # Most ticks to do for a frame, so that a long stall isn't all caught up.
+        self.max_frame_skip = 2
+        self.interpolate = False            # True=rocks and bullets drawn part way between their last two ticks.
+
+        # True=quality level lowered when frames take longer than 1/target_fps, and raised when there is time to spare.
+        # Frame times are looked at over 2 seconds. See quality_governor.LEVELS for what each level does.
+        self.adaptive_quality = True
+        if numpy_arrays.available():
+            levels = quality_governor.LEVELS
+        else:
+            levels = quality_governor.LEVELS_WITHOUT_PARTICLES      # Smaller ship explosions, drawn one dot at a time.
+        # The governor only goes down from the level the game was tuned to, never above it, so that a game on a fast
+        # computer has the same number of rocks as on the Pi Zero, and its score can be compared. To let it go higher,
+        # set config.governor.max_level = len(config.governor.levels) - 1.
+        self.governor = quality_governor.QualityGovernor(levels, quality_governor.DEFAULT_LEVEL,
+                                                         1000 / target_fps, 2 * target_fps, 0.6,
+                                                         quality_governor.DEFAULT_LEVEL)
+        self.quality = self.governor.settings()     # Settings of the current quality level.
+        self.lag = 0                        # Ticks that the objects being drawn are behind the game logic. 0 to 1.
+
+        # True=rocks and ship drawn by blitting sprites, pre-drawn at every 10 degrees of rotation, using up to 4 MB.
+        self.sprites = False
+        self.sprite_cache = sprite_cache.SpriteCache(10, 4 * 1024 * 1024)
+        self.render_queue = renderer.RenderQueue()      # Rocks, ships, bullets and particles waiting to be drawn.
         self.num_players = 1
 
         self.demo_mode = True
         self.quit = False                   # Will become true when the use chooses to quit the game.
 
-        os.putenv('SDL_FBDEV', '/dev/fb1')
-
-        pygame.init()                       # Initialize the game engine.
+        if headless:
+            os.putenv('SDL_VIDEODRIVER', 'dummy')   # Draw into memory rather than onto a real screen.
+            pygame.display.init()                   # Only the parts of the game engine that don't need hardware.
+        elif framebuffer_path is not None:
+            os.putenv('SDL_VIDEODRIVER', 'dummy')   # Draw into memory, then frames are copied to the framebuffer.
+            pygame.display.init()
+        else:
+            os.putenv('SDL_FBDEV', '/dev/fb1')
+            pygame.display.init()                   # Only the parts of the game engine that are used. Not pygame.init().
+        self.startup.stage('pygame init')
 
         # Define the colors we will use in RGB format.
         self.BLACK = (0, 0, 0)
@@ -706,29 +1272,92 @@ class Config:
         # Set the height and width of the viewport.
         self.screen_size = [320, 240]
         self.screen_centre = [int(self.screen_size[0] / 2), int(self.screen_size[1] / 2)]
-        self.screen = pygame.display.set_mode(self.screen_size, flags=pygame.FULLSCREEN)
+        if headless:
+            self.screen = pygame.display.set_mode(self.screen_size)
+            self.clock = FixedClock(target_fps)
+        elif framebuffer_path is not None:
+            self.screen = pygame.display.set_mode(self.screen_size, 0, 32)
+            self.clock = pygame.time.Clock()
+        else:
+            self.screen = pygame.display.set_mode(self.screen_size, flags=pygame.FULLSCREEN)
+            self.clock = pygame.time.Clock()
 
         pygame.mouse.set_visible(False)             # Turn off the mouse pointer.
+        self.startup.stage('display')
 
-        self.clock = pygame.time.Clock()
+        # If there is a framebuffer path (such as '/dev/fb1'), frames are written straight into it, in RGB565 format,
+        # rather than being sent to the display by SDL. The length of each scanline is read from the device's driver.
+        if framebuffer_path is not None:
+            self.framebuffer = framebuffer.FramebufferOutput(framebuffer_path, self.screen_size,
+                                                             framebuffer.device_line_length(framebuffer_path))
+        else:
+            self.framebuffer = None
 
-        # Start the Pygame text rendering system.
+        # Start the Pygame text rendering system. The font file is found once, and remembered in font_cache_file, as
+        # searching the system's fonts is slow.
         pygame.font.init()
-        self.myfont = pygame.font.SysFont('Courier New', 20)
+        self.font_cache_file = 'font_cache.json'
+        font_path = text_cache.find_font('Courier New', self.font_cache_file)
+        self.myfont = pygame.font.Font(font_path, 20)
+        self.overlay_font = pygame.font.Font(font_path, 10)     # Small, to fit the profiler timings on screen.
+
+        # Rendered text is cached, so it is only rendered again when it changes.
+        self.text_cache = text_cache.TextCache(self.myfont, 64)
+        self.overlay_text_cache = text_cache.TextCache(self.overlay_font, 64)
 
 #        pygame.display.set_caption('Space Rocks')   # The game window title.
 
-        # Start the Pygame sound system.
-        pygame.mixer.init()
-        pygame.mixer.set_num_channels(3)            # One channel for laser gun fires, one for explosions.
+        self.startup.stage('fonts')
+
+        # Sounds are silent until they have been loaded.
+        self.explosion_sound = self.laser_sound = self.ship_explosion_sound = SilentSound()
+        self.explosion_channel = self.laser_channel = self.ship_explosion_channel = SilentSound()
+
+        # These are used straight away to start the mixer and load the sounds, so are parms rather than being set
+        # after the Config has been made.
+        # True=sounds are loaded in the background, so that the demo can start being drawn meanwhile.
+        self.background_sound_load = background_sound_load
+        self.sound_loader = None
+        self.sound_preset = sound_preset                # Mixer buffer size. See audio.PRESETS.
+        self.sound_cache_folder = sound_cache_folder    # Sounds converted to the mixer's format are saved here.
+        self.sound_player = None
+        self.sound_monitor = None
+        if not headless:
+            # Start the Pygame sound system.
+            audio.start_mixer(self.sound_preset)
+            pygame.mixer.set_num_channels(3)            # One channel for laser gun fires, one for explosions.
+            self.sound_player = audio.Player()
+            if debug:                                   # Only wanted for the report at the end.
+                self.sound_monitor = audio.StallMonitor(audio.buffer_seconds(self.sound_preset))
+
+            if self.background_sound_load:
+                self.sound_loader = threading.Thread(target=self.load_sounds, daemon=True)
+                self.sound_loader.start()
+            else:
+                self.load_sounds()
+        self.startup.stage('sound')
+
+        # Key presses come from SDL, or from a Linux input device if one is given, such as the GamePi20's joystick.
+        # In headless mode no keys are ever pressed, unless they are passed to Game.key_handling().
+        if input_device is not None:
+            self.input = input_events.InputQueue(input_events.EvdevSource(input_device))
+        elif headless:
+            self.input = input_events.InputQueue()
+        else:
+            self.input = input_events.InputQueue(input_events.PygameSource())
+
+        # Size of the world that the rocks fly around in. If it is bigger than the screen, the screen is a viewport onto
+        # the part of it around the first player's ship, and there are more rocks, the same number per screenful.
+        if world_size is None:
+            world_size = self.screen_size
+        self.world_size = world_size
+        self.world_centre = [int(world_size[0] / 2), int(world_size[1] / 2)]
+        self.camera = [0, 0]                            # World coordinates of the top left corner of the screen.
 
-        # Get some game sounds ready, and allocate sound channels for them.
-        self.explosion_sound = pygame.mixer.Sound('assets/110115__ryansnook__small-explosion.wav')
-        self.laser_sound = pygame.mixer.Sound('assets/341235__sharesynth__laser01.wav')
-        self.ship_explosion_sound = pygame.mixer.Sound('assets/235968__tommccann__explosion-01.wav')
-        self.explosion_channel = pygame.mixer.Channel(0)
-        self.laser_channel = pygame.mixer.Channel(1)
-        self.ship_explosion_channel = pygame.mixer.Channel(2)
+        # Rocks further than far_distance outside of the screen can't be seen or hit, so they are only moved every
+        # far_update_interval ticks.
+        self.far_distance = 150
+        self.far_update_interval = 4
 
         # Border greater than width of largest possible rock. This ensures that when a rock is removed for being
         # outside of the screen plus border, we can be sure that all of the rock is off screen. If the border wasn't
@@ -740,31 +1369,98 @@ class Config:
         # These are the edges of the zone where graphical objects are born and die.
         self.left_dead = - self.border
         self.top_dead = -self.border
-        self.right_dead = self.screen_size[0] + self.border
-        self.bottom_dead = self.screen_size[1] + self.border
+        self.right_dead = self.world_size[0] + self.border
+        self.bottom_dead = self.world_size[1] + self.border
 
         self.screenshot_num = 1                         # Number of screenshots taken.
 
+        # Supplies of rocks and bullets, made now so that the game doesn't have to create them while it is running.
+        self.rock_pool = RockPool(self, 64, 16)
+        self.bullet_pool = BulletPool(10)               # Enough for 2 players, each with the max of 5 bullets.
+
+        # Explosion particles, moved and drawn in batches. Needs NumPy, otherwise each particle is drawn by its owner.
+        if numpy_arrays.available():
+            self.particles = particles.ParticleSystem(256)
+        else:
+            self.particles = None
+        self.startup.stage('pools')
+
+    # Get some game sounds ready, and allocate sound channels for them.
+    def load_sounds(self):
+        start = time.perf_counter()
+        explosion_sound = audio.load_sound('assets/110115__ryansnook__small-explosion.wav', self.sound_cache_folder)
+        laser_sound = audio.load_sound('assets/341235__sharesynth__laser01.wav', self.sound_cache_folder)
+        ship_explosion_sound = audio.load_sound('assets/235968__tommccann__explosion-01.wav', self.sound_cache_folder)
+
+        # Sounds are swapped in before the channels, as a real channel can't play a SilentSound.
+        self.explosion_sound = explosion_sound
+        self.laser_sound = laser_sound
+        self.ship_explosion_sound = ship_explosion_sound
+        self.explosion_channel = audio.QueuedChannel(pygame.mixer.Channel(0), self.sound_player)
+        self.laser_channel = audio.QueuedChannel(pygame.mixer.Channel(1), self.sound_player)
+        self.ship_explosion_channel = audio.QueuedChannel(pygame.mixer.Channel(2), self.sound_player)
+        trace(self, 'Sounds loaded in ' + str(round(1000 * (time.perf_counter() - start), 1)) + ' ms')
+
+    # Is parm point of the world more than parm distance outside of the screen?
+    def is_far(self, coords, distance):
+        x = coords[0] - self.camera[0]
+        y = coords[1] - self.camera[1]
+        return (x < - distance or x > self.screen_size[0] + distance
+                or y < - distance or y > self.screen_size[1] + distance)
+
+    # Current time in seconds. In headless mode this is game time, counted in ticks of the fixed clock.
+    def now(self):
+        if self.headless:
+            return self.clock.ticks / self.target_fps
+        return time.time()
+
+    # Make a new game to be played. Its randomness starts from a new seed, so that it can be replayed from that seed.
+    def new_game(self):
+        self.game_seed = self.random.randrange(2 ** 32)
+        self.random.seed(self.game_seed)
+        this_game = Game(self)
+
+        if self.replay_folder is not None:
+            os.makedirs(self.replay_folder, exist_ok=True)
+            replay_name = os.path.join(self.replay_folder, 'replay' + format(self.replay_num, '04') + '.bin')
+            this_game.recorder = replay.Recorder(replay_name, self)
+            self.replay_num += 1
+
+        return this_game
+
     def choose_options(self):
         this_game = Game(self)
 
+        # Draw the first frame straight away, rather than waiting for the clock to say that a frame's time is up.
+        self.clock.tick()
+        this_game.simulate_1_tick()
+        if self.render:
+            this_game.draw_all_elements()
+
+        self.startup.stage('first frame')
+        for line in self.startup.report():
+            trace(self, line)
+
         while not self.quit:
-            for event in pygame.event.get():  # User did something
-                if event.type == pygame.QUIT:  # If user clicked close
-                    self.quit = True  # Flag that we are done so we exit this loop, and quit the game
+            self.profiler.start('input')
+            keys = self.input.keys()
+            self.profiler.stop()
 
-            keys = pygame.key.get_pressed()
+            if self.input.quit:                 # If user clicked close
+                self.quit = True                # Flag that we are done so we exit this loop, and quit the game
 
             if keys[pygame.K_1]:                # '1' key starts a one player game.
                 self.num_players = 1
-                this_game = Game(self)
+                this_game.release_to_pools()
+                this_game = self.new_game()
                 this_game.play()
                 self.demo_mode = True
                 self.monochrome = True          # Demo mode is monochrome.
 
             if keys[pygame.K_2]:                # '2' key starts a two player game.
                 self.num_players = 2
-                this_game = Game(self)
+                this_game.release_to_pools()
+                this_game = self.new_game()
                 this_game.play()
                 self.demo_mode = True
                 self.monochrome = True          # Demo mode is monochrome.
@@ -776,7 +1472,25 @@ class Config:
                 self.quit = True
 
             if not self.quit:
-                this_game.animate_1_tick()
+                this_game.animate_frame()
+
+        if self.profile:
+            self.profiler.save(self.profile_file)
+
+        if self.framebuffer is not None:
+            trace(self, self.framebuffer.report())
+            self.framebuffer.close()
+
+        if self.sound_loader is not None:
+            self.sound_loader.join()                # Don't shut down the sound system while sounds are loading.
+        self.input.close()
+        if self.tracer is not None:
+            self.tracer.close()
+        if self.sound_player is not None:
+            self.sound_player.close()
+        if self.sound_monitor is not None:
+            self.sound_monitor.close()
+            trace(self, self.sound_monitor.report())
 
         # Be IDLE friendly.
         pygame.quit()
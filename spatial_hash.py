@@ -0,0 +1,80 @@
+# Uniform grid of cells covering the game screen plus its border. Rocks are put into each cell that they overlap, so
+# that collision checks for a bullet or ship only need to be done against the rocks in the one cell that it is in.
+
+
+class SpatialHash:
+
+    def __init__(self, config, cell_size):
+        self.cell_size = cell_size                          # Width and height of each cell, in pixels.
+
+        # The grid covers the zone where graphical objects are born and die.
+        self.left = config.left_dead
+        self.top = config.top_dead
+        self.columns = int((config.right_dead - config.left_dead) / cell_size) + 1
+        self.rows = int((config.bottom_dead - config.top_dead) / cell_size) + 1
+
+        self.cells = [[] for c in range(self.columns * self.rows)]
+        self.count = 0                                      # Number of items currently in the grid.
+
+        # Counters, so that the pruning done by the grid can be measured.
+        self.all_pairs = 0                                  # Pairs that would be checked without the grid.
+        self.candidate_pairs = 0                            # Pairs that shared a cell, so needed a proper check.
+        self.hits = 0                                       # Candidate pairs that turned out to be collisions.
+
+    # Empty the grid, ready for it to be rebuilt. The cell lists are reused, to avoid allocating new ones every tick.
+    def clear(self):
+        for cell in self.cells:
+            cell.clear()
+        self.count = 0
+
+    # Column and row numbers of parm coordinates, limited to the edges of the grid.
+    def cell_of(self, coords):
+        column = int((coords[0] - self.left) // self.cell_size)
+        row = int((coords[1] - self.top) // self.cell_size)
+        return min(max(column, 0), self.columns - 1), min(max(row, 0), self.rows - 1)
+
+    # Put parm item into every cell that is overlapped by the square of parm radius around parm coords.
+    def insert(self, item, coords, radius):
+        [first_column, first_row] = self.cell_of([coords[0] - radius, coords[1] - radius])
+        [last_column, last_row] = self.cell_of([coords[0] + radius, coords[1] + radius])
+
+        for row in range(first_row, last_row + 1):
+            for column in range(first_column, last_column + 1):
+                self.cells[row * self.columns + column].append(item)
+
+        self.count += 1
+
+    # List of the items that might be at parm coords. Coords outside the grid can't hit anything.
+    def query(self, coords):
+        self.all_pairs += self.count
+
+        column = int((coords[0] - self.left) // self.cell_size)
+        row = int((coords[1] - self.top) // self.cell_size)
+        if column < 0 or column >= self.columns or row < 0 or row >= self.rows:
+            return []
+
+        candidates = self.cells[row * self.columns + column]
+        self.candidate_pairs += len(candidates)
+        return candidates
+
+    # List of the items in the cells overlapped by the rectangle from parm top left to parm bottom right coords. Each
+    # item is in the list once, however many of the cells it is in.
+    def query_rect(self, top_left, bottom_right):
+        [first_column, first_row] = self.cell_of(top_left)
+        [last_column, last_row] = self.cell_of(bottom_right)
+
+        found = {}                                          # Dictionary rather than set, so the order is repeatable.
+        for row in range(first_row, last_row + 1):
+            for column in range(first_column, last_column + 1):
+                for item in self.cells[row * self.columns + column]:
+                    found[item] = True
+        return list(found)
+
+    # Text summary of the counters.
+    def report(self):
+        if self.all_pairs == 0:
+            return 'Collision pairs: none checked.'
+        return ('Collision pairs: all=' + str(self.all_pairs)
+                + ', candidates=' + str(self.candidate_pairs)
+                + ' (' + str(round(100 * self.candidate_pairs / self.all_pairs, 1)) + '%)'
+                + ', hits=' + str(self.hits))
@@ -0,0 +1,58 @@
+# Cache of pre-drawn sprites of the rock and ship shapes. Each shape is drawn once per rotation angle (rounded to the
+# nearest angle_step degrees) onto its own small surface, so drawing it on screen is just one blit, with no geometry.
+
+import collections
+import math
+import pygame                           # 2d games engine.
+
+
+class SpriteCache:
+
+    def __init__(self, angle_step, max_bytes):
+        self.angle_step = angle_step                    # Rotations are rounded to a multiple of this many degrees.
+        self.max_bytes = max_bytes                      # Most memory that the sprites are allowed to use.
+        self.bytes = 0                                  # Memory currently used by the sprites.
+
+        # Key is (shape, angle, colour, filled), value is (surface, half_size). Shape is a cc.RotationCache. Keyed on
+        # the object itself rather than its id(), as ids can be reused once the rock that owned the shape has gone.
+        self.sprites = collections.OrderedDict()
+
+    # Surface with parm shape drawn on it, rotated to the nearest angle_step to parm rotation. Also returns the
+    # distance from the edge of the surface to the centre of the shape.
+    def sprite(self, screen, shape, rotation, colour, filled):
+        angle = int(self.angle_step * round(rotation / self.angle_step)) % 360
+        key = (shape, angle, tuple(colour), filled)
+
+        if key in self.sprites:
+            self.sprites.move_to_end(key)               # Now the most recently used.
+            return self.sprites[key]
+
+        vertices = shape.rotated(angle)
+        half_size = int(math.ceil(max(max(abs(x), abs(y)) for [x, y] in vertices))) + 1
+        outline = [[x + half_size, y + half_size] for [x, y] in vertices]
+
+        surface = pygame.Surface([2 * half_size + 1, 2 * half_size + 1], 0, screen)     # Same format as screen.
+        surface.set_colorkey((0, 0, 0))                 # Black is transparent when the sprite is blitted.
+        if filled:
+            pygame.draw.polygon(surface, colour, outline, 0)
+        else:
+            pygame.draw.lines(surface, colour, True, outline, 1)
+
+        self.sprites[key] = (surface, half_size)
+        self.bytes += surface.get_bytesize() * surface.get_width() * surface.get_height()
+
+        # Drop the least recently used sprites, until back under the memory cap.
+        while self.bytes > self.max_bytes and len(self.sprites) > 1:
+            [old_surface, old_half_size] = self.sprites.popitem(last=False)[1]
+            self.bytes -= old_surface.get_bytesize() * old_surface.get_width() * old_surface.get_height()
+
+        return surface, half_size
+
+    # Sprite of parm shape, and the position to blit it at so that it is centred at parm coords.
+    def position(self, screen, shape, rotation, coords, colour, filled):
+        [surface, half_size] = self.sprite(screen, shape, rotation, colour, filled)
+        return surface, (round(coords[0]) - half_size, round(coords[1]) - half_size)
+
+    # Blit parm shape onto the screen, centred at parm coords. Returns the rectangle of the screen that was drawn on.
+    def draw(self, screen, shape, rotation, coords, colour, filled):
+        return screen.blit(*self.position(screen, shape, rotation, coords, colour, filled))
@@ -0,0 +1,20 @@
+# Micro-benchmark comparing the ways of rotating vertices in the cartesian_coordinates package.
+
+import cartesian_coordinates as cc
+import timeit
+
+repeats = 100000
+rock = [cc.rotate_around_origin([0, 30], 30 * v_num) for v_num in range(12)]    # Shape like a Large rock.
+cache = cc.RotationCache(rock)
+
+print('Should be true', cc.rotate_by_table([3, 4], 37) == cc.rotate_around_origin([3, 4], 37))
+print('Should be true', cache.rotated(-10) == [cc.rotate_around_origin(v, 350) for v in rock])
+
+print('Time for', repeats, 'single vertex rotations, in seconds,')
+print('rotate_around_origin', timeit.timeit(lambda: cc.rotate_around_origin([3, 4], 37), number=repeats))
+print('rotate_by_table     ', timeit.timeit(lambda: cc.rotate_by_table([3, 4], 37), number=repeats))
+
+print('Time for', repeats, 'whole rock rotations (12 vertices), in seconds,')
+print('rotate_around_origin', timeit.timeit(lambda: [cc.rotate_around_origin(v, 37) for v in rock], number=repeats))
+print('rotate_by_table     ', timeit.timeit(lambda: [cc.rotate_by_table(v, 37) for v in rock], number=repeats))
+print('RotationCache       ', timeit.timeit(lambda: cache.rotated(37), number=repeats))
@@ -0,0 +1,82 @@
+# Report how many bytes of memory each kind of game object uses, including the lists it owns (coords, drift, etc.)
+# Shared things, such as rock shapes and the config, are not counted.
+#
+# For comparison, each object is also copied into a stand-in that keeps its attributes in a __dict__, and ships have
+# their own copy of the ship's shape, as they all did before __slots__ and the shared ship shape were used.
+
+import cartesian_coordinates as cc
+import space_rocks
+import sys
+import tracemalloc
+
+count = 1000                                        # Number of each object to make. Bytes are averaged over them.
+config = space_rocks.Config(False, 25, headless=True, seed=1)
+shape = space_rocks.RockShape(config, 'Large')
+
+
+def make_rock():
+    rock = space_rocks.Rock(config, 'Large', shape)
+    rock.place_on_side_of_screen(config)
+    rock.move()
+    return rock
+
+
+def make_bullet():
+    bullet = space_rocks.Bullet([160.0, 120.0], 30, config.RED)
+    bullet.move()
+    return bullet
+
+
+def make_ship():
+    return space_rocks.SpaceShip(config, config.screen_centre, config.RED)
+
+
+def make_player():
+    return space_rocks.Player(config, 'Player 1', config.RED, config.screen_centre)
+
+
+GAME_CLASSES = (space_rocks.Rock, space_rocks.Bullet, space_rocks.SpaceShip, space_rocks.Player)
+
+
+# Stand-in for a game object from before __slots__ were used.
+class DictBacked:
+    pass
+
+
+# Copy parm object's attributes into a DictBacked, along with any game objects it owns. Returns the copy, and the
+# number of bytes of the slotted objects that it stands in for.
+def dict_backed(obj):
+    copy = DictBacked()
+    replaced = sys.getsizeof(obj)
+    for name in type(obj).__slots__:
+        if hasattr(obj, name):
+            value = getattr(obj, name)
+            if isinstance(value, GAME_CLASSES):
+                [value, value_replaced] = dict_backed(value)
+                replaced += value_replaced
+            setattr(copy, name, value)
+
+    if isinstance(obj, space_rocks.SpaceShip):      # Each ship had its own shape, and cache of rotations of it.
+        copy.vertices = [list(vertex) for vertex in obj.vertices]
+        copy.shape = cc.RotationCache(copy.vertices)
+    return [copy, replaced]
+
+
+print('Bytes per object,       with __dict__  with __slots__')
+for name, make in [('Rock', make_rock), ('Bullet', make_bullet), ('SpaceShip', make_ship), ('Player', make_player)]:
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    objects = [make() for n in range(count)]
+    slotted = tracemalloc.get_traced_memory()[0] - start
+
+    copies = []
+    replaced = 0
+    for obj in objects:
+        [copy, obj_replaced] = dict_backed(obj)
+        copies.append(copy)
+        replaced += obj_replaced
+    copied = tracemalloc.get_traced_memory()[0] - start - slotted
+    tracemalloc.stop()
+
+    print(name.ljust(22), str(round((slotted - replaced + copied) / count)).rjust(14),
+          str(round(slotted / count)).rjust(15))
@@ -0,0 +1,41 @@
+# Test the sound cache and the sound player thread. Uses SDL's dummy audio driver if there is no sound card.
+
+import audio
+import os
+import pygame
+import shutil
+import tempfile
+import time
+
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+audio.start_mixer('low latency')
+pygame.mixer.set_num_channels(1)
+
+cache_folder = tempfile.mkdtemp()
+filename = 'assets/341235__sharesynth__laser01.wav'
+
+start = time.perf_counter()
+converted = audio.load_sound(filename, cache_folder)
+first_ms = 1000 * (time.perf_counter() - start)
+print('Should be 1', len(os.listdir(cache_folder)))
+
+start = time.perf_counter()
+cached = audio.load_sound(filename, cache_folder)
+cached_ms = 1000 * (time.perf_counter() - start)
+print('Should be True', cached.get_raw() == converted.get_raw())
+print('Converted in', round(first_ms, 2), 'ms, loaded from cache in', round(cached_ms, 2), 'ms')
+
+player = audio.Player()
+channel = audio.QueuedChannel(pygame.mixer.Channel(0), player)
+channel.play(cached)
+player.close()                                          # Waits for the sound to be started.
+print('Should be True', pygame.mixer.Channel(0).get_busy())
+
+print('Should be 11.6', round(1000 * audio.buffer_seconds('low latency'), 1))
+monitor = audio.StallMonitor(audio.buffer_seconds('low latency'))
+time.sleep(0.1)
+monitor.close()
+print(monitor.report())
+
+pygame.quit()
+shutil.rmtree(cache_folder)
@@ -0,0 +1,23 @@
+# Test the batch runner gives the same results however many processes the games are spread over.
+
+import batch_runner
+
+
+# Run parm number of steps of 3 games over parm number of processes, all with the same keys. Return the observations.
+def run(processes, steps):
+    runner = batch_runner.BatchRunner(3, processes, seed=5)
+    observations = runner.reset()
+    for s in range(steps):
+        observations, rewards, dones = runner.step([s % 8, (s // 10) % 8, 4])
+    runner.close()
+    return observations, runner.statistics()
+
+
+if __name__ == '__main__':                  # Needed where processes are started by spawning a new Python.
+    one, stats = run(1, 1600)
+    three, stats = run(3, 1600)
+
+    print('Should be (3, ' + str(batch_runner.observation_size(32)) + ')', one.shape)
+    print('Should be true', (one == three).all())
+    print('Should be 3', stats['games_finished'])
+    print(stats)
@@ -1,6 +1,35 @@
-# Test the triangle functions.
+# Test the triangle functions, and the tuple and in place variants of the coordinate functions.
 
 import cartesian_coordinates as cc
+import math
+import random
+
+print('Should be (13, 24)', cc.translation_tuple([10, 20], [3, 4]))
+print('Should be (15.0, 30.0)', cc.scale_tuple([10, 20], 1.5))
+vertex = [10, 20]
+cc.translate_in_place(vertex, [3, 4])
+print('Should be [13, 24]', vertex)
+cc.scale_in_place(vertex, 2)
+print('Should be [26, 48]', vertex)
+
+
+# Is parm vertex within a millionth of parm expected vertex?
+def close_to(vertex, expected):
+    return abs(vertex[0] - expected[0]) < 1e-6 and abs(vertex[1] - expected[1]) < 1e-6
+
+
+# The variants of rotate_around_a_point give the same answer, for whole numbers of degrees (int or float), and for
+# angles in between, which aren't in the lookup table.
+mismatches = 0
+for angle in [0, 30, 30.0, 359, -90, 400, 0.5, 37.25, -12.75, 359.9]:
+    expected = cc.rotate_around_a_point([15, 7], [10, 20], angle)
+    vertex = [15, 7]
+    cc.rotate_around_a_point_in_place(vertex, [10, 20], angle)
+    rotated = cc.rotate_around_a_point_tuple([15, 7], [10, 20], angle)
+    if not close_to(rotated, expected) or not close_to(vertex, expected):
+        mismatches += 1
+print('Should be 0', mismatches)
+print('Should be True', close_to(cc.rotate_around_a_point_tuple([20, 20], [10, 20], 90), (10, 10)))
 
 #         v2(10, 30)
 #             / \
@@ -12,3 +41,47 @@ import cartesian_coordinates as cc
 
 print('Should be true', cc.is_inside_triangle([10, 15], [0, 0], [10, 30], [20, 0]))
 print('Should be false', cc.is_inside_triangle([25, 15], [0, 0], [10, 30], [20, 0]))
+print('Should be true', cc.is_inside_triangle_by_sign([10, 15], [0, 0], [10, 30], [20, 0]))
+print('Should be false', cc.is_inside_triangle_by_sign([25, 15], [0, 0], [10, 30], [20, 0]))
+
+# A square, made as a fan of 4 triangles from its centre.
+square = [[-10, -10], [10, -10], [10, 10], [-10, 10]]
+print('Should be [True, False, False]', cc.are_inside_fan([[5, 5], [15, 5], [0, 20]], [0, 0], square, 15))
+
+
+# Shortest distance from vertex v to the line segment from v1 to v2.
+def distance_to_edge(v, v1, v2):
+    length_squared = (v2[0] - v1[0]) ** 2 + (v2[1] - v1[1]) ** 2
+    t = ((v[0] - v1[0]) * (v2[0] - v1[0]) + (v[1] - v1[1]) * (v2[1] - v1[1])) / length_squared
+    t = min(max(t, 0), 1)
+    return math.hypot(v[0] - v1[0] - t * (v2[0] - v1[0]), v[1] - v1[1] - t * (v2[1] - v1[1]))
+
+
+# Compare the sign based rock test with the area based triangle test, for lots of random points around lots of random
+# rock shaped polygons. Points very close to an edge are skipped, as the area test counts points up to a fraction of
+# a pixel outside of an edge as being inside.
+random.seed(1)
+mismatches = 0
+for r in range(200):
+    radius = random.randint(7, 35)
+    vertices = [cc.rotate_around_origin([0, radius + random.randint(-3, 3)], 30 * v_num) for v_num in range(12)]
+    centre = [random.uniform(0, 320), random.uniform(0, 240)]
+    rotation = random.randint(0, 359)
+    outline = [cc.translation(cc.rotate_around_origin(v, rotation), centre) for v in vertices]
+
+    for p in range(100):
+        v = [centre[0] + random.uniform(-40, 40), centre[1] + random.uniform(-40, 40)]
+        if min(distance_to_edge(v, outline[n - 1], outline[n]) for n in range(12)) < 1:
+            continue
+
+        by_area = False
+        prev_vertex = outline[-1]
+        for vertex in outline:
+            if cc.is_inside_triangle(v, prev_vertex, vertex, centre):
+                by_area = True
+            prev_vertex = vertex
+
+        if by_area != cc.is_inside_fan(v, centre, outline):
+            mismatches += 1
+
+print('Should be 0', mismatches)
@@ -0,0 +1,46 @@
+# Tests of the entity store.
+
+import entity_store
+
+store = entity_store.EntityStore()
+handles = [store.spawn(name) for name in ['a', 'b', 'c', 'd']]
+print('Should be 0', len(store))                                # Nothing added until the flush.
+print('Should be 4', store.len_after_flush())
+
+store.flush()
+print("Should be ['a', 'b', 'c', 'd']", list(store))
+
+store.despawn(handles[1])
+store.despawn(handles[1])                                       # Asking twice only removes it once.
+print('Should be b', store.get(handles[1]))                     # Still there until the flush.
+print("Should be ['b']", store.flush())
+print("Should be ['a', 'd', 'c']", list(store))                 # Last one has been moved into the gap.
+print('Should be None', store.get(handles[1]))
+
+e = store.spawn('e')                                            # Reuses the slot that 'b' had.
+store.flush()
+print('Should be True', e[0] == handles[1][0])
+print('Should be None', store.get(handles[1]))                  # Old handle does not find the new entity.
+print('Should be e', store.get(e))
+print('Should be d', store.get(handles[3]))                     # Handles still work after entities have moved.
+
+# Removing entities while looping over them doesn't skip any.
+seen = []
+for position, name in enumerate(store):
+    seen.append(name)
+    store.despawn(store.handle_at(position))
+print("Should be ['a', 'd', 'c', 'e']", seen)
+store.flush()
+print('Should be 0', len(store))
+
+# A handle can be queued for removal again after a flush, even though it was queued before.
+g = store.spawn('g')
+store.flush()
+store.despawn(g)
+store.flush()
+store.despawn(g)
+print('Should be 1', len(store.despawn_queue))
+print('Should be []', store.flush())                            # Already removed by the first flush.
+
+store.spawn('f')
+print("Should be ['f']", store.clear())
@@ -0,0 +1,74 @@
+# Test the framebuffer output, using a plain file as the framebuffer.
+
+import framebuffer
+import os
+import pygame
+import shutil
+import space_rocks
+import tempfile
+
+size = [320, 240]
+[handle, path] = tempfile.mkstemp()
+os.write(handle, bytes(2 * size[0] * size[1]))             # Same size as a 320x240 RGB565 framebuffer.
+os.close(handle)
+
+surface = pygame.Surface(size, 0, 32)
+output = framebuffer.FramebufferOutput(path, size)
+print('Should be 0', output.update(surface))                # All black, same as the framebuffer already is.
+
+pygame.draw.rect(surface, (255, 0, 0), [10, 20, 5, 3])      # Red rectangle on scanlines 20, 21 and 22.
+pygame.draw.rect(surface, (0, 0, 255), [10, 100, 5, 1])     # Blue line on scanline 100.
+print('Should be 4', output.update(surface))
+print('Should be 0', output.update(surface))                # Nothing has changed since last frame.
+
+with open(path, 'rb') as f:
+    data = f.read()
+[x, y] = [12, 21]
+print('Should be 0xf800', hex(data[2 * (y * size[0] + x)] | data[2 * (y * size[0] + x) + 1] << 8))   # Red in RGB565.
+[x, y] = [12, 100]
+print('Should be 0x1f', hex(data[2 * (y * size[0] + x)] | data[2 * (y * size[0] + x) + 1] << 8))     # Blue.
+output.close()
+print('Should be None', framebuffer.device_line_length(path))  # A plain file, rather than a framebuffer device.
+
+# A framebuffer device whose driver pads each scanline to 704 bytes, made from a file, and a folder standing in for
+# sysfs.
+folder = tempfile.mkdtemp()
+for name in ['dev', 'sys', os.path.join('sys', 'fb9')]:
+    os.mkdir(os.path.join(folder, name))
+for [setting, value] in [['stride', '704\n'], ['bits_per_pixel', '16\n']]:
+    with open(os.path.join(folder, 'sys', 'fb9', setting), 'w') as f:
+        f.write(value)
+device = os.path.join(folder, 'dev', 'fb9')
+with open(device, 'wb') as f:
+    f.write(bytes(704 * size[1]))
+
+line_length = framebuffer.device_line_length(device, os.path.join(folder, 'sys'))
+print('Should be 704', line_length)
+output = framebuffer.FramebufferOutput(device, size, line_length)
+print('Should be 4', output.update(surface))
+output.close()
+with open(device, 'rb') as f:
+    data = f.read()
+[x, y] = [12, 100]
+print('Should be 0x1f', hex(data[y * 704 + 2 * x] | data[y * 704 + 2 * x + 1] << 8))     # Blue, on a padded scanline.
+
+with open(os.path.join(folder, 'sys', 'fb9', 'bits_per_pixel'), 'w') as f:
+    f.write('32\n')
+try:
+    framebuffer.device_line_length(device, os.path.join(folder, 'sys'))
+    print('Should be refused, but was not')
+except ValueError as e:
+    print('Should be refused as 32 bit,', e)
+shutil.rmtree(folder)
+
+# A whole game drawing into the framebuffer.
+config = space_rocks.Config(False, 25, headless=True, seed=1)
+config.render = True
+config.framebuffer = framebuffer.FramebufferOutput(path, config.screen_size)
+this_game = space_rocks.Game(config)
+for t in range(100):
+    this_game.animate_1_tick()
+print(config.framebuffer.report())
+config.framebuffer.close()
+
+os.remove(path)
@@ -0,0 +1,50 @@
+# Test that headless mode runs quickly, and that the same seed always gives the same game.
+
+import space_rocks
+import time
+
+
+# Play a headless game for parm number of ticks, with the ship turning and firing. Return a summary of its state.
+def play(config, ticks):
+    this_game = space_rocks.Game(config)
+    config.demo_mode = False
+
+    for t in range(ticks):
+        this_game.players[0].ship.rotate_clockwise()
+        this_game.players[0].ship.fire_bullet(config)
+        this_game.animate_1_tick()
+
+    return [this_game.players[0].score] + [r.coords for r in this_game.rocks]
+
+
+ticks = 2000
+start = time.time()
+first = play(space_rocks.Config(False, 25, headless=True, seed=42), ticks)
+print('Ticks per second', round(ticks / (time.time() - start)))
+
+print('Should be true', first == play(space_rocks.Config(False, 25, headless=True, seed=42), ticks))
+print('Should be false', first == play(space_rocks.Config(False, 25, headless=True, seed=43), ticks))
+
+
+# Clock that says every frame took parm milliseconds, as if the computer was too slow to keep up.
+class SlowClock(space_rocks.FixedClock):
+
+    def __init__(self, target_fps, frame_ms):
+        space_rocks.FixedClock.__init__(self, target_fps)
+        self.frame_ms = frame_ms
+
+    def tick(self, framerate=0):
+        self.ticks += 1
+        return self.frame_ms
+
+
+# With a fixed timestep, the game logic keeps to target_fps ticks per second of real time, even when frames are slow.
+config = space_rocks.Config(False, 25, headless=True, seed=42)
+config.clock = SlowClock(25, 70)
+config.render = True
+this_game = space_rocks.Game(config)
+for f in range(100):
+    this_game.animate_frame()
+print('Should be 175', sum(ticks * frames for ticks, frames in this_game.ticks_per_frame.items())
+      + this_game.ticks_since_drawn)
+print(this_game.frame_report())
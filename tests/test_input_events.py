@@ -0,0 +1,51 @@
+# Test the input queue with a scripted source of key events, so no real keyboard or joystick is needed.
+
+import input_events
+import os
+import pygame
+import shutil
+import space_rocks
+import tempfile
+import time
+
+# A tap of the A key much shorter than a tick, then the Z key held down.
+script = [[0.005, pygame.K_a, True], [0.010, pygame.K_a, False], [0.020, pygame.K_z, True]]
+queue = input_events.InputQueue(input_events.FakeSource(script))
+queue.close()                                           # Waits for the whole script to be played.
+
+keys = queue.keys()
+print('Should be True', keys[pygame.K_a])              # The tap is latched until the game has seen it.
+print('Should be True', keys[pygame.K_z])
+keys = queue.keys()
+print('Should be False', keys[pygame.K_a])             # Only seen once.
+print('Should be True', keys[pygame.K_z])              # Still held down.
+
+time.sleep(0.01)
+queue.frame_drawn()
+print('Should be 2', len(queue.latencies))
+print('Should be True', min(queue.latencies) >= 10)
+print(queue.report())
+
+# Linux input events, written into a named pipe standing in for the joystick's device. Joystick left, then A button.
+folder = tempfile.mkdtemp()
+device = os.path.join(folder, 'event0')
+os.mkfifo(device)
+write_fd = os.open(device, os.O_RDWR)                  # Opened first, so the reader doesn't see the end of the file.
+queue = input_events.InputQueue(input_events.EvdevSource(device))
+os.write(write_fd, input_events.EVENT.pack(0, 0, input_events.EV_ABS, input_events.ABS_X, -1))
+os.write(write_fd, input_events.EVENT.pack(0, 0, input_events.EV_KEY, 0x130, 1))
+time.sleep(0.2)
+keys = queue.keys()
+print('Should be True True False', keys[pygame.K_z], keys[pygame.K_a], keys[pygame.K_x])
+queue.close()
+os.close(write_fd)
+shutil.rmtree(folder)
+
+# The tap fires a bullet in a headless game.
+config = space_rocks.Config(False, 25, headless=True, seed=1)
+this_game = config.new_game()
+config.demo_mode = False
+config.input = input_events.InputQueue(input_events.FakeSource([[0, pygame.K_a, True], [0.001, pygame.K_a, False]]))
+config.input.close()
+this_game.key_handling()
+print('Should be 1', this_game.players[0].ship.bullets.len_after_flush())
@@ -0,0 +1,30 @@
+# Test the render queue, by drawing some shapes with it and directly with Pygame, and checking that they look the same.
+
+import pygame
+import renderer
+
+size = [100, 100]
+queued = pygame.Surface(size, 0, 32)
+direct = pygame.Surface(size, 0, 32)
+queue = renderer.RenderQueue()
+
+square = [[10, 10], [30, 10], [30, 30], [10, 30]]
+triangle = [[50, 50], [80, 60], [60, 80]]
+
+queue.outline((255, 255, 255), square)
+queue.dot(queued, (255, 0, 0), [40, 40], 2, 2)
+queue.dot(queued, (255, 0, 0), [45, 40], 2, 2)
+queue.fill((0, 255, 0), triangle)
+queue.dot(queued, (0, 0, 255), [70, 20], 4, 0)
+print('Should be 5', len(queue.submit(queued)))
+print('Should be 4', queue.last_calls)                  # The two red dots are blitted in one call.
+
+pygame.draw.lines(direct, (255, 255, 255), True, square, 1)
+pygame.draw.circle(direct, (255, 0, 0), [40, 40], 2, 2)
+pygame.draw.circle(direct, (255, 0, 0), [45, 40], 2, 2)
+pygame.draw.polygon(direct, (0, 255, 0), triangle, 0)
+pygame.draw.circle(direct, (0, 0, 255), [70, 20], 4, 0)
+print('Should be True', pygame.image.tostring(queued, 'RGB') == pygame.image.tostring(direct, 'RGB'))
+
+print('Should be 0', len(queue.submit(queued)))         # The queue is emptied each frame.
+print(queue.report())
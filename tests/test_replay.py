@@ -0,0 +1,32 @@
+# Test that a recorded game plays back exactly the same.
+
+import os
+import replay
+import space_rocks
+import tempfile
+
+ticks = 1500
+folder = tempfile.mkdtemp()
+
+# Play a game with a made up player, who holds each combination of keys for a while.
+config = space_rocks.Config(False, 25, headless=True, seed=7)
+config.replay_folder = folder
+this_game = config.new_game()
+config.demo_mode = False
+for t in range(ticks):
+    this_game.key_handling(replay.RecordedKeys((t // 40) % 8))     # Z, X and A keys.
+    this_game.animate_1_tick()
+this_game.recorder.close()
+played = [this_game.players[0].score] + [r.coords for r in this_game.rocks]
+
+filename = os.path.join(folder, 'replay0001.bin')
+print('Bytes per tick', round(os.path.getsize(filename) / ticks, 3))
+
+recording = replay.Recording(filename)
+replayed_game = replay.make_game(recording, False)
+print('Should be', ticks, replay.play_ticks(recording, replayed_game))
+print('Should be true', played == [replayed_game.players[0].score] + [r.coords for r in replayed_game.rocks])
+print('Score', played[0])
+
+os.remove(filename)
+os.rmdir(folder)
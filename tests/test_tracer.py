@@ -0,0 +1,57 @@
+# Test the tracer's ring buffer, and that its events are written to the file.
+
+import os
+import tempfile
+import tracer
+
+[handle, filename] = tempfile.mkstemp()
+os.close(handle)
+
+event_tracer = tracer.Tracer(filename, 8, interval=60)     # Only writes when closed, within the test.
+event_tracer.record(tracer.ROCK_CREATED, tracer.SIZES.index('Medium'))
+event_tracer.record(tracer.ROCK_REMOVED, tracer.SIZES.index('Large'), 5)
+event_tracer.write()
+for n in range(10):                                         # More than fit in the ring buffer.
+    event_tracer.record(tracer.QUALITY_CHANGED, n)
+print('Should be 12', event_tracer.head)
+event_tracer.close()
+
+with open(filename) as f:
+    lines = f.read().splitlines()
+print('Should be Medium rock created.', lines[0].split('  ')[-1])
+print('Should be Large rock removed, rocks left=5', lines[1].split('  ')[-1])
+print('Should be Quality level changed to 2', lines[2].split('  ')[-1])    # 0 and 1 were overwritten.
+print('Should be 2 events were dropped, as the ring buffer was full.', lines[-1])
+print('Should be 11', len(lines))
+
+
+# Ring buffer that has parm number more events recorded into it, by the game's thread, while the first event is read.
+class BusyBuffer(list):
+
+    def __init__(self, items, busy_tracer, count):
+        list.__init__(self, items)
+        self.busy_tracer = busy_tracer
+        self.count = count
+
+    def __getitem__(self, n):
+        item = list.__getitem__(self, n)
+        for c in range(self.count):
+            self.busy_tracer.record(tracer.QUALITY_CHANGED, 100 + c)
+        self.count = 0
+        return item
+
+
+event_tracer = tracer.Tracer(filename, 8, interval=60)
+for n in range(6):
+    event_tracer.record(tracer.QUALITY_CHANGED, n)
+event_tracer.buffer = BusyBuffer(event_tracer.buffer, event_tracer, 4)    # Overwrites events 0 and 1 mid write.
+event_tracer.write()
+print('Should be 2', event_tracer.dropped)
+event_tracer.close()
+
+with open(filename) as f:
+    lines = f.read().splitlines()
+print('Should be Quality level changed to 2', lines[0].split('  ')[-1])
+print('Should be Quality level changed to 100', lines[4].split('  ')[-1])
+print('Should be 2 events were dropped, as the ring buffer was full.', lines[-1])
+os.remove(filename)
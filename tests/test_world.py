@@ -0,0 +1,47 @@
+# Test a world bigger than the screen: the camera, the culling of rocks that aren't on screen, and the lower update rate
+# of rocks that are far away.
+
+import space_rocks
+
+config = space_rocks.Config(False, 25, headless=True, seed=3, world_size=[1280, 960])
+config.adaptive_quality = False
+config.vectorised = False
+this_game = config.new_game()
+print('Should be True', this_game.scrolling)
+print('Should be 240', this_game.num_rocks)                 # 16 screens' worth of 15 rocks.
+print('Should be [480, 360]', config.camera)                # Ship is in the centre of the world, and of the screen.
+
+# A far away rock moves every few ticks, but ends up in the same place as if it had moved every tick.
+for t in range(5):
+    this_game.simulate_1_tick()
+far_rock = [r for r in this_game.rocks if r.far and r.idle_ticks == 0][0]
+start = list(far_rock.coords)
+for t in range(4 * config.far_update_interval):
+    this_game.simulate_1_tick()
+moved = [far_rock.coords[0] - start[0], far_rock.coords[1] - start[1]]
+expected = [4 * config.far_update_interval * d for d in far_rock.drift]
+print('Should be True', abs(moved[0] - expected[0]) < 1e-9 and abs(moved[1] - expected[1]) < 1e-9)
+
+# Every rock that overlaps the screen is drawn, and the rest of the world's rocks aren't.
+visible = this_game.visible_rocks()
+on_screen = [r for r in this_game.rocks if not config.is_far(r.coords, r.bounding_radius)]
+print('Should be True', set(on_screen) <= set(visible))
+print('Should be True', len(visible) < len(this_game.rocks) / 4)
+
+# Default world is the screen, so nothing scrolls.
+config = space_rocks.Config(False, 25, headless=True, seed=3)
+this_game = config.new_game()
+print('Should be False', this_game.scrolling)
+print('Should be [0, 0]', config.camera)
+
+# Explosion particles are drawn where they are in the world, not moved by the camera twice.
+config = space_rocks.Config(False, 25, headless=True, seed=3, world_size=[1280, 960])
+config.monochrome = False
+this_game = config.new_game()
+config.particles.clear()
+config.particles.emit([640, 480], [[0, 0]], [10], (255, 255, 255))
+config.render_queue.camera = config.camera                  # As set by Game.draw_all_elements().
+config.particles.draw(config)
+[kind, surface, position] = config.render_queue.commands[-1]
+print('Should be (156, 116)', position)                     # World [640, 480] less camera [480, 360], less radius 4.
+config.render_queue.commands = []
@@ -0,0 +1,61 @@
+# Cache of rendered text. Rendering text with the font is slow, but the same few strings ('Score: 0', 'FPS = 25', etc.)
+# are drawn over and over again, so each one only needs rendering when it first appears.
+#
+# Also, a cache of where the font files are, as finding a font by name is slow.
+
+import collections
+import json
+import os
+import pygame                           # 2d games engine.
+
+
+# Path of the font file with parm name, or None if there is no such font (in which case pygame's default font is used).
+# Looking fonts up in the system's list of fonts is slow, especially from an SD card, so the path is saved in parm
+# cache file and looked up there first next time. Delete the cache file if the fonts are changed.
+def find_font(name, cache_file):
+    cache = {}
+    try:
+        with open(cache_file) as f:
+            cache = json.load(f)
+    except (IOError, ValueError):
+        pass                                            # No cache yet, or it's corrupt, so start a new one.
+
+    if name in cache and (cache[name] is None or os.path.exists(cache[name])):
+        return cache[name]
+
+    path = pygame.font.match_font(name)
+    cache[name] = path
+    try:
+        with open(cache_file, 'w') as f:
+            json.dump(cache, f, indent=2)
+    except IOError:
+        pass                                            # Can't be saved, so it will be looked up again next time.
+    return path
+
+
+class TextCache:
+
+    def __init__(self, font, max_entries):
+        self.font = font
+        self.max_entries = max_entries                  # When cache is full, least recently used text is dropped.
+        self.surfaces = collections.OrderedDict()       # Key is (text, colour), value is rendered surface.
+
+        self.hits = 0                                   # Counts of texts found in cache, and not found.
+        self.misses = 0
+
+    # Surface with parm text rendered onto it in parm colour.
+    def render(self, text, colour):
+        key = (text, tuple(colour))                     # Some colours are lists, which can't be dictionary keys.
+
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)              # Now the most recently used.
+            self.hits += 1
+            return surface
+
+        surface = self.font.render(text, False, colour)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)           # Drop the least recently used.
+        self.misses += 1
+        return surface
@@ -0,0 +1,81 @@
+# Log of things that happen in the middle of a tick, such as rocks being created and removed, cheap enough to leave on
+# while timing frames. The game's thread only puts a tuple of a timestamp, an event number and two ints into a ring
+# buffer that is allocated up front. A background thread turns them into text and writes them to a file, so the game's
+# thread never waits for the console or the SD card.
+#
+# When tracing is off, config.tracer is None, and the only cost is checking that.
+
+import threading
+import time
+
+# Event numbers, and the text that each one is written to the log as. {0} and {1} are the event's two ints.
+ROCK_CREATED = 0
+ROCK_REMOVED = 1
+BULLET_REMOVED = 2
+QUALITY_CHANGED = 3
+FORMATS = ['{0} rock created.',
+           '{0} rock removed, rocks left={1}',
+           'Bullet removed, bullets left for Player {0} ={1}',
+           'Quality level changed to {0}']
+
+# Rock sizes are traced as their position in this list, so that the game's thread doesn't pass strings around.
+SIZES = ['Small', 'Medium', 'Large']
+
+
+class Tracer:
+
+    def __init__(self, filename, capacity, interval=0.5):
+        self.capacity = capacity                    # Number of events that fit in the ring buffer.
+        self.buffer = [None] * capacity
+        self.head = 0                               # Number of events recorded so far.
+        self.tail = 0                               # Number of events written to the file so far.
+        self.dropped = 0                            # Events overwritten before the writer got to them.
+
+        self.start = time.perf_counter()
+        self.file = open(filename, 'w')
+        self.interval = interval                    # Seconds between writes to the file.
+        self.stopping = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    # Record parm event, with up to two ints of data. Called by the game's thread.
+    def record(self, event, a=0, b=0):
+        self.buffer[self.head % self.capacity] = (time.perf_counter(), event, a, b)
+        self.head += 1
+
+    def run(self):
+        while not self.stopping.wait(self.interval):
+            self.write()
+
+    # Write the events recorded since the last write to the file.
+    def write(self):
+        head = self.head
+        if head - self.tail > self.capacity:        # The ring buffer has gone all the way round since the last write.
+            self.dropped += head - self.tail - self.capacity
+            self.tail = head - self.capacity
+
+        lines = []
+        for n in range(self.tail, head):
+            [when, event, a, b] = self.buffer[n % self.capacity]
+            if event in [ROCK_CREATED, ROCK_REMOVED]:
+                a = SIZES[a]
+            lines.append(format(1000 * (when - self.start), '10.3f') + ' ms  ' + FORMATS[event].format(a, b) + '\n')
+
+        # The game's thread carries on recording while the events are read, so it may have gone all the way round the
+        # ring buffer and overwritten the oldest of them with newer events. Those can't be trusted, so are dropped.
+        overwritten = min(self.head - self.capacity, head) - self.tail
+        if overwritten > 0:
+            self.dropped += overwritten
+            lines = lines[overwritten:]
+        self.tail = head
+
+        self.file.writelines(lines)
+        self.file.flush()
+
+    def close(self):
+        self.stopping.set()
+        self.thread.join()
+        self.write()
+        if self.dropped:
+            self.file.write(str(self.dropped) + ' events were dropped, as the ring buffer was full.\n')
+        self.file.close()